@@ -1,7 +1,9 @@
 import asyncio
+import re
 from logging.config import fileConfig
 
 from alembic import context
+from alembic.runtime.environment import NameFilterParentNames, NameFilterType
 from sqlalchemy import pool
 from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import async_engine_from_config
@@ -9,6 +11,7 @@ from sqlalchemy.sql.ddl import CreateSchema
 
 import app.main  # noqa: F401
 from app.common.config import db_meta, settings
+from app.users.utils.session_partitions import PARTITION_PREFIX, sessions_table
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -32,6 +35,19 @@ target_metadata = db_meta
 # my_important_option = config.get_main_option("my_important_option")
 # ... etc.
 
+# session partitions are managed in runtime, see app.users.utils.session_partitions
+SESSION_PARTITION_NAME = re.compile(
+    rf"{sessions_table.name}_default|{PARTITION_PREFIX}\d{{8}}"
+)
+
+
+def include_name(
+    name: str | None, type_: NameFilterType, parent_names: NameFilterParentNames
+) -> bool:
+    if type_ == "table" and name is not None:
+        return SESSION_PARTITION_NAME.fullmatch(name) is None
+    return True
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
@@ -63,6 +79,7 @@ def do_run_migrations(connection: Connection) -> None:
         target_metadata=target_metadata,
         version_table_schema=target_metadata.schema,
         include_schemas=True,
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -0,0 +1,164 @@
+"""partition_sessions
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-17 14:02:17.853940
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "013"
+down_revision: Union[str, None] = "012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SESSION_COLUMNS = (
+    "id, user_id, token, expiry, disabled, previous_token, "
+    "previous_token_expiry, created, cross_site, mub"
+)
+
+
+def create_session_indexes() -> None:
+    op.create_index(
+        "hash_index_session_token",
+        "sessions",
+        ["token"],
+        unique=False,
+        schema="xi_auth",
+        postgresql_using="hash",
+    )
+    op.create_index(
+        "hash_index_session_previous_token",
+        "sessions",
+        ["previous_token"],
+        unique=False,
+        schema="xi_auth",
+        postgresql_using="hash",
+    )
+    op.create_index(
+        "index_session_user_id_expiry",
+        "sessions",
+        ["user_id", sa.text("expiry DESC")],
+        unique=False,
+        schema="xi_auth",
+    )
+    op.create_index(
+        "index_session_user_id_mub_expiry",
+        "sessions",
+        ["user_id", "mub", sa.text("expiry DESC")],
+        unique=False,
+        schema="xi_auth",
+    )
+    op.create_index(
+        "partial_index_session_active_user_id_mub_expiry",
+        "sessions",
+        ["user_id", "mub", sa.text("expiry DESC")],
+        unique=False,
+        schema="xi_auth",
+        postgresql_where=sa.text("disabled IS false"),
+    )
+
+
+def drop_session_indexes() -> None:
+    for index_name in (
+        "hash_index_session_token",
+        "hash_index_session_previous_token",
+        "index_session_user_id_expiry",
+        "index_session_user_id_mub_expiry",
+        "partial_index_session_active_user_id_mub_expiry",
+    ):
+        op.drop_index(index_name, table_name="sessions", schema="xi_auth")
+
+
+def replace_sessions_table(partitioned: bool) -> None:
+    drop_session_indexes()
+    op.rename_table("sessions", "sessions_old", schema="xi_auth")
+    op.execute(
+        "ALTER TABLE xi_auth.sessions_old "
+        "RENAME CONSTRAINT pk_sessions TO pk_sessions_old"
+    )
+    op.execute("ALTER SEQUENCE xi_auth.sessions_id_seq OWNED BY NONE")
+
+    op.create_table(
+        "sessions",
+        sa.Column(
+            "id",
+            sa.Integer(),
+            server_default=sa.text("nextval('xi_auth.sessions_id_seq'::regclass)"),
+            nullable=False,
+        ),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("token", sa.CHAR(length=50), nullable=False),
+        sa.Column("expiry", sa.DateTime(), nullable=False),
+        sa.Column("disabled", sa.Boolean(), nullable=False),
+        sa.Column("previous_token", sa.CHAR(length=50), nullable=True),
+        sa.Column("previous_token_expiry", sa.DateTime(), nullable=True),
+        sa.Column("created", sa.DateTime(), nullable=False),
+        sa.Column("cross_site", sa.Boolean(), nullable=False),
+        sa.Column("mub", sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["xi_auth.users.id"],
+            name=op.f("fk_sessions_user_id_users"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint(
+            *(("id", "expiry") if partitioned else ("id",)),
+            name=op.f("pk_sessions"),
+        ),
+        schema="xi_auth",
+        **({"postgresql_partition_by": "RANGE (expiry)"} if partitioned else {}),
+    )
+    op.execute("ALTER SEQUENCE xi_auth.sessions_id_seq OWNED BY xi_auth.sessions.id")
+
+    if partitioned:
+        op.execute(
+            "CREATE TABLE xi_auth.sessions_default "
+            "PARTITION OF xi_auth.sessions DEFAULT"
+        )
+        # weekly partitions from the retention limit to a few weeks ahead,
+        # older sessions go into the default partition (to be cleaned up)
+        op.execute(
+            """
+            DO $$
+            DECLARE period_start date;
+            BEGIN
+                FOR period_start IN
+                    SELECT generate_series(
+                        date_trunc('week', now() - interval '7 days'),
+                        date_trunc('week', now() + interval '21 days'),
+                        interval '7 days'
+                    )::date
+                LOOP
+                    EXECUTE format(
+                        'CREATE TABLE xi_auth.%I PARTITION OF xi_auth.sessions '
+                        'FOR VALUES FROM (%L) TO (%L)',
+                        'sessions_p' || to_char(period_start, 'YYYYMMDD'),
+                        period_start,
+                        period_start + 7
+                    );
+                END LOOP;
+            END $$;
+            """
+        )
+
+    op.execute(
+        f"INSERT INTO xi_auth.sessions ({SESSION_COLUMNS}) "  # noqa: S608
+        f"SELECT {SESSION_COLUMNS} FROM xi_auth.sessions_old"
+    )
+    op.drop_table("sessions_old", schema="xi_auth")
+    create_session_indexes()
+
+
+def upgrade() -> None:
+    replace_sessions_table(partitioned=True)
+
+
+def downgrade() -> None:
+    replace_sessions_table(partitioned=False)
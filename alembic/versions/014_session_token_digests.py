@@ -0,0 +1,106 @@
+"""session_token_digests
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-17 15:21:40.318265
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "014"
+down_revision: Union[str, None] = "013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "sessions",
+        sa.Column("token_digest", sa.LargeBinary(length=32), nullable=True),
+        schema="xi_auth",
+    )
+    op.add_column(
+        "sessions",
+        sa.Column("previous_token_digest", sa.LargeBinary(length=32), nullable=True),
+        schema="xi_auth",
+    )
+    # same as app.common.cryptography.hash_token (char to text drops the padding)
+    op.execute(
+        "UPDATE xi_auth.sessions SET "
+        "token_digest = sha256(convert_to(token::text, 'UTF8')), "
+        "previous_token_digest = sha256(convert_to(previous_token::text, 'UTF8'))"
+    )
+    op.alter_column("sessions", "token_digest", nullable=False, schema="xi_auth")
+
+    op.drop_index("hash_index_session_token", table_name="sessions", schema="xi_auth")
+    op.drop_index(
+        "hash_index_session_previous_token", table_name="sessions", schema="xi_auth"
+    )
+    op.drop_column("sessions", "token", schema="xi_auth")
+    op.drop_column("sessions", "previous_token", schema="xi_auth")
+
+    op.create_index(
+        "hash_index_session_token_digest",
+        "sessions",
+        ["token_digest"],
+        unique=False,
+        schema="xi_auth",
+        postgresql_using="hash",
+    )
+    op.create_index(
+        "hash_index_session_previous_token_digest",
+        "sessions",
+        ["previous_token_digest"],
+        unique=False,
+        schema="xi_auth",
+        postgresql_using="hash",
+    )
+
+
+def downgrade() -> None:
+    # raw tokens can't be restored from digests, so all sessions are signed out
+    op.execute("DELETE FROM xi_auth.sessions")
+
+    op.drop_index(
+        "hash_index_session_token_digest", table_name="sessions", schema="xi_auth"
+    )
+    op.drop_index(
+        "hash_index_session_previous_token_digest",
+        table_name="sessions",
+        schema="xi_auth",
+    )
+    op.drop_column("sessions", "token_digest", schema="xi_auth")
+    op.drop_column("sessions", "previous_token_digest", schema="xi_auth")
+
+    op.add_column(
+        "sessions",
+        sa.Column("token", sa.CHAR(length=50), nullable=False),
+        schema="xi_auth",
+    )
+    op.add_column(
+        "sessions",
+        sa.Column("previous_token", sa.CHAR(length=50), nullable=True),
+        schema="xi_auth",
+    )
+    op.create_index(
+        "hash_index_session_token",
+        "sessions",
+        ["token"],
+        unique=False,
+        schema="xi_auth",
+        postgresql_using="hash",
+    )
+    op.create_index(
+        "hash_index_session_previous_token",
+        "sessions",
+        ["previous_token"],
+        unique=False,
+        schema="xi_auth",
+        postgresql_using="hash",
+    )
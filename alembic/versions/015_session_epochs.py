@@ -0,0 +1,37 @@
+"""session_epochs
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-17 17:12:05.649218
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "015"
+down_revision: Union[str, None] = "014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column("session_epoch", sa.Integer(), nullable=False, server_default="0"),
+        schema="xi_auth",
+    )
+    op.add_column(
+        "sessions",
+        sa.Column("epoch", sa.Integer(), nullable=False, server_default="0"),
+        schema="xi_auth",
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("sessions", "epoch", schema="xi_auth")
+    op.drop_column("users", "session_epoch", schema="xi_auth")
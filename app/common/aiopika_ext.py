@@ -3,7 +3,7 @@ from __future__ import annotations
 import json
 import logging
 from abc import ABC
-from collections.abc import Sequence
+from collections.abc import Awaitable, Callable, Sequence
 from typing import Any
 
 from aio_pika import Message
@@ -11,11 +11,14 @@ from aio_pika.abc import (
     AbstractChannel,
     AbstractConnection,
     AbstractExchange,
+    AbstractIncomingMessage,
     AbstractQueue,
     DeliveryMode,
     ExchangeType,
 )
 
+EventHandler = Callable[[Any, str | None], Awaitable[None]]
+
 
 class AbstractRabbitProducer:  # pragma: no coverage
     async def connect(self, connection: AbstractConnection) -> None:
@@ -91,3 +94,33 @@ class RabbitFanoutProducer(RabbitExchangeProducer):  # pragma: no coverage
         for queue_name in self.queues:
             queue: AbstractQueue = await channel.declare_queue(queue_name)
             await queue.bind(self.exchange)
+
+
+class RabbitFanoutConsumer:  # pragma: no coverage
+    """
+    Receives every event sent to a fanout exchange through an exclusive
+    auto-deleted queue, so that each process gets its own copy of events
+    """
+
+    def __init__(self, exchange: str, handler: EventHandler) -> None:
+        self.exchange_name: str = exchange
+        self.handler: EventHandler = handler
+        self.queue: AbstractQueue | None = None
+
+    async def connect(self, connection: AbstractConnection) -> None:
+        channel: AbstractChannel = await connection.channel()
+        exchange = await channel.declare_exchange(
+            name=self.exchange_name,
+            type=ExchangeType.FANOUT,
+        )
+        self.queue = await channel.declare_queue(exclusive=True, auto_delete=True)
+        await self.queue.bind(exchange)
+        await self.queue.consume(self.process_message)
+
+    async def process_message(self, message: AbstractIncomingMessage) -> None:
+        async with message.process():
+            event_name = message.headers.get("event_name")
+            await self.handler(
+                json.loads(message.body),
+                None if event_name is None else str(event_name),
+            )
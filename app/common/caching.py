@@ -0,0 +1,59 @@
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from time import monotonic
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Bounded in-process cache with per-entry expiration and LRU eviction
+
+    Entries are stored together with their deadline (by :py:func:`time.monotonic`),
+    expired entries are dropped lazily on access or when the cache is full
+    """
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self.max_size: int = max_size
+        self.ttl: float = ttl
+        self.entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: K) -> V | None:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        if self.max_size <= 0:
+            return
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            self.entries.pop(key, None)
+            return
+        self.entries[key] = (monotonic() + ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def pop(self, key: K) -> V | None:
+        entry = self.entries.pop(key, None)
+        return None if entry is None else entry[1]
+
+    def evict_where(self, predicate: Callable[[V], bool]) -> int:
+        keys = [key for key, (_, value) in self.entries.items() if predicate(value)]
+        for key in keys:
+            del self.entries[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        self.entries.clear()
@@ -9,8 +9,13 @@ from sqlalchemy import MetaData
 from sqlalchemy.ext.asyncio import AsyncAttrs, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
-from app.common.aiopika_ext import RabbitDirectProducer
+from app.common.aiopika_ext import RabbitDirectProducer, RabbitFanoutProducer
 from app.common.cryptography import CryptographyProvider, TokenGenerator
+from app.common.password_hashing import (
+    PasswordHasher,
+    PasswordHashingBackend,
+    PasswordHashingPolicy,
+)
 from app.common.sqlalchemy_ext import MappingBase, sqlalchemy_naming_convention
 
 
@@ -29,6 +34,29 @@ class FernetSettings(BaseModel):
         )
 
 
+class SessionCacheSettings(BaseModel):
+    max_size: int = 10000
+    ttl: int = 60
+    invalid_max_size: int = 50000
+    invalid_ttl: int = 10
+
+
+class SessionSweeperSettings(BaseModel):
+    interval: int | None = 10 * 60  # None disables the sweeper
+    batch_size: int = 1000  # users per transaction
+
+
+class PasswordHashingSettings(BaseModel):
+    backend: PasswordHashingBackend = PasswordHashingBackend.THREAD
+    max_workers: int | None = None  # defaults to the number of cores
+    max_queue_size: int = 100
+    retry_after: int = 1
+
+    scheme: str = "pbkdf2_sha256"
+    rounds: int | None = None  # scheme's default if not set
+    deprecated_schemes: list[str] = []
+
+
 class EmailSettings(BaseModel):
     hostname: str
     username: str
@@ -71,6 +99,12 @@ class Settings(BaseSettings):
     email_confirmation_keys: FernetSettings = FernetSettings(
         encryption_ttl=60 * 60 * 24
     )
+    access_token_keys: FernetSettings | None = None
+
+    session_cache: SessionCacheSettings = SessionCacheSettings()
+    session_sweeper: SessionSweeperSettings = SessionSweeperSettings()
+    proxy_auth_cache_max_age: int = 0
+    password_hashing: PasswordHashingSettings = PasswordHashingSettings()
 
     demo_webhook_url: str | None = None
     vacancy_webhook_url: str | None = None
@@ -92,6 +126,7 @@ class Settings(BaseSettings):
     postgres_automigrate: bool = True
     postgres_echo: bool = True
     postgres_pool_recycle: int = 280
+    postgres_autocommit_reads: bool = True
 
     @computed_field
     @property
@@ -110,6 +145,7 @@ class Settings(BaseSettings):
     mq_username: str = "guest"
     mq_password: str = "guest"
     mq_pochta_queue: str = "pochta.send"
+    mq_sessions_exchange: str = "xi.auth.sessions"
 
     @computed_field
     @property
@@ -151,6 +187,11 @@ db_meta = MetaData(
     schema=settings.postgres_schema,
 )
 sessionmaker = async_sessionmaker(bind=engine, expire_on_commit=False)
+# no BEGIN/COMMIT round trips, every statement is committed on its own
+autocommit_sessionmaker = async_sessionmaker(
+    bind=engine.execution_options(isolation_level="AUTOCOMMIT"),
+    expire_on_commit=False,
+)
 
 
 class Base(AsyncAttrs, DeclarativeBase, MappingBase):
@@ -161,6 +202,7 @@ class Base(AsyncAttrs, DeclarativeBase, MappingBase):
 
 
 pochta_producer = RabbitDirectProducer(queue_name=settings.mq_pochta_queue)
+sessions_producer = RabbitFanoutProducer(exchange=settings.mq_sessions_exchange)
 
 password_reset_cryptography = CryptographyProvider(
     settings.password_reset_keys.keys,
@@ -171,4 +213,24 @@ email_confirmation_cryptography = CryptographyProvider(
     encryption_ttl=settings.email_confirmation_keys.encryption_ttl,
 )
 
+access_token_cryptography: CryptographyProvider | None = (
+    None
+    if settings.access_token_keys is None
+    else CryptographyProvider(
+        settings.access_token_keys.keys,
+        encryption_ttl=settings.access_token_keys.encryption_ttl,
+    )
+)
+
+password_hasher = PasswordHasher(
+    max_workers=settings.password_hashing.max_workers,
+    backend=settings.password_hashing.backend,
+    max_queue_size=settings.password_hashing.max_queue_size,
+    policy=PasswordHashingPolicy(
+        scheme=settings.password_hashing.scheme,
+        rounds=settings.password_hashing.rounds,
+        deprecated_schemes=tuple(settings.password_hashing.deprecated_schemes),
+    ),
+)
+
 token_generator = TokenGenerator(randomness=40, length=50)
@@ -1,3 +1,4 @@
+from hashlib import sha256
 from secrets import token_urlsafe
 
 from cryptography.fernet import Fernet, InvalidToken, MultiFernet
@@ -29,3 +30,7 @@ class TokenGenerator:
 
     def generate_token(self) -> str:
         return token_urlsafe(self.token_randomness)[: self.token_length]
+
+
+def hash_token(token: str) -> bytes:
+    return sha256(token.encode("utf-8")).digest()
@@ -0,0 +1,177 @@
+import multiprocessing
+import os
+from asyncio import Semaphore, gather, get_running_loop
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import StrEnum
+from functools import lru_cache
+from time import perf_counter
+from typing import Any, TypeVar
+
+from passlib.context import CryptContext
+
+
+@dataclass(frozen=True, slots=True)
+class PasswordHashingPolicy:
+    """
+    Hashes are created with ``scheme`` (and ``rounds``, if set), hashes created
+    with any of ``deprecated_schemes`` or with different rounds need an update
+    """
+
+    scheme: str = "pbkdf2_sha256"
+    rounds: int | None = None
+    deprecated_schemes: tuple[str, ...] = ()
+
+
+@lru_cache
+def get_crypt_context(policy: PasswordHashingPolicy) -> CryptContext:
+    # policies are passed to workers instead of contexts, since those can't be pickled
+    options: dict[str, Any] = {}
+    if policy.rounds is not None:
+        options[f"{policy.scheme}__default_rounds"] = policy.rounds
+        options[f"{policy.scheme}__min_rounds"] = policy.rounds
+        options[f"{policy.scheme}__max_rounds"] = policy.rounds
+    return CryptContext(
+        schemes=[policy.scheme, *policy.deprecated_schemes],
+        default=policy.scheme,
+        deprecated=list(policy.deprecated_schemes),
+        **options,
+    )
+
+
+def hash_password(password: str, policy: PasswordHashingPolicy) -> str:
+    return get_crypt_context(policy).hash(password)
+
+
+def verify_password(
+    password: str, password_hash: str, policy: PasswordHashingPolicy
+) -> bool:
+    return get_crypt_context(policy).verify(password, password_hash)
+
+
+T = TypeVar("T")
+
+
+class PasswordHashingOverloadedError(Exception):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class PasswordHashingMetrics:
+    in_flight: int
+    queue_depth: int
+    admitted: int
+    rejected: int
+    wait_time_total: float
+    wait_time_max: float
+
+
+class PasswordHashingBackend(StrEnum):
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+class PasswordHasher:
+    """
+    Runs pbkdf2 hashing & verification in a dedicated pool, so that it doesn't
+    block the event loop. Threads are enough for a single core (hashlib releases
+    the GIL), processes allow scaling a single worker over multiple cores
+
+    At most ``max_workers`` operations are submitted to the pool at once, up to
+    ``max_queue_size`` more wait for their turn, anything beyond that is rejected
+    with :py:class:`PasswordHashingOverloadedError` instead of piling up
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        backend: PasswordHashingBackend = PasswordHashingBackend.THREAD,
+        max_queue_size: int = 100,
+        policy: PasswordHashingPolicy = PasswordHashingPolicy(),
+    ) -> None:
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.backend = backend
+        self.policy = policy
+        self.executor: Executor | None = None
+
+        self.max_queue_size = max_queue_size
+        self.semaphore = Semaphore(self.max_workers)
+        self.in_flight = 0
+        self.queue_depth = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def get_executor(self) -> Executor:
+        if self.executor is None:
+            if self.backend is PasswordHashingBackend.PROCESS:
+                # forking a process with a running event loop & threads is unsafe
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="password-hasher",
+                )
+        return self.executor
+
+    async def run(self, function: Callable[..., T], *args: Any) -> T:
+        if self.semaphore.locked() and self.queue_depth >= self.max_queue_size:
+            self.rejected += 1
+            raise PasswordHashingOverloadedError
+
+        self.queue_depth += 1
+        started = perf_counter()
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.queue_depth -= 1
+        wait_time = perf_counter() - started
+        self.wait_time_total += wait_time
+        self.wait_time_max = max(self.wait_time_max, wait_time)
+        self.admitted += 1
+
+        self.in_flight += 1
+        try:
+            return await get_running_loop().run_in_executor(
+                self.get_executor(), function, *args
+            )
+        finally:
+            self.in_flight -= 1
+            self.semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        return await self.run(hash_password, password, self.policy)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self.run(verify_password, password, password_hash, self.policy)
+
+    def needs_update(self, password_hash: str) -> bool:
+        """Check if the hash is outdated by the policy (no key derivation involved)"""
+        return get_crypt_context(self.policy).needs_update(password_hash)
+
+    def metrics(self) -> PasswordHashingMetrics:
+        return PasswordHashingMetrics(
+            in_flight=self.in_flight,
+            queue_depth=self.queue_depth,
+            admitted=self.admitted,
+            rejected=self.rejected,
+            wait_time_total=self.wait_time_total,
+            wait_time_max=self.wait_time_max,
+        )
+
+    async def start(self) -> None:
+        """Spawn all workers ahead of time, so first requests don't pay for it"""
+        password_hash = hash_password("warm-up", self.policy)
+        await gather(
+            *(self.verify("warm-up", password_hash) for _ in range(self.max_workers))
+        )
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,200 @@
+"""
+Calibrates password hashing for the current hardware: measures hash & verify
+latencies and signins (verifications) per second for the configured scheme
+across rounds and pool sizes, then recommends the strongest settings meeting
+the targets. Prints JSON to keep track of results over time. Run with::
+
+    python -m app.common.password_hashing_benchmark --target-p99 250 --target-rps 50
+"""
+
+import json
+import os
+import platform
+import sys
+from argparse import ArgumentParser, Namespace
+from asyncio import gather, run
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime, timezone
+from math import ceil
+from time import perf_counter
+from typing import Any
+
+from app.common.config import password_hasher as configured_password_hasher
+from app.common.password_hashing import (
+    PasswordHasher,
+    PasswordHashingBackend,
+    PasswordHashingPolicy,
+    get_crypt_context,
+    hash_password,
+)
+
+BENCHMARK_PASSWORD = "benchmark-password"
+
+
+@dataclass(frozen=True, slots=True)
+class Measurement:
+    rounds: int
+    backend: PasswordHashingBackend
+    max_workers: int
+    hash_p50_ms: float
+    hash_p99_ms: float
+    verify_p50_ms: float
+    verify_p99_ms: float
+    signins_per_second: float
+
+
+def percentile(latencies: list[float], fraction: float) -> float:
+    ordered = sorted(latencies)
+    return ordered[max(ceil(len(ordered) * fraction) - 1, 0)]
+
+
+async def run_closed_loop(
+    operation: Callable[[], Awaitable[Any]], clients: int, requests: int
+) -> tuple[list[float], float]:
+    """Keep ``clients`` operations in flight, return latencies (ms) & total time"""
+    latencies: list[float] = []
+
+    async def client(operations: int) -> None:
+        for _ in range(operations):
+            started = perf_counter()
+            await operation()
+            latencies.append((perf_counter() - started) * 1000)
+
+    started = perf_counter()
+    await gather(*(client(ceil(requests / clients)) for _ in range(clients)))
+    return latencies, perf_counter() - started
+
+
+async def measure(
+    policy: PasswordHashingPolicy,
+    backend: PasswordHashingBackend,
+    max_workers: int,
+    requests: int,
+) -> Measurement:
+    password_hasher = PasswordHasher(
+        max_workers=max_workers,
+        backend=backend,
+        max_queue_size=requests,
+        policy=policy,
+    )
+    password_hash = hash_password(BENCHMARK_PASSWORD, policy)
+    try:
+        await password_hasher.start()
+        hash_latencies, _ = await run_closed_loop(
+            lambda: password_hasher.hash(BENCHMARK_PASSWORD),
+            clients=max_workers,
+            requests=requests,
+        )
+        verify_latencies, elapsed = await run_closed_loop(
+            lambda: password_hasher.verify(BENCHMARK_PASSWORD, password_hash),
+            clients=max_workers,
+            requests=requests,
+        )
+    finally:
+        password_hasher.shutdown()
+
+    return Measurement(
+        rounds=policy.rounds or 0,
+        backend=backend,
+        max_workers=max_workers,
+        hash_p50_ms=round(percentile(hash_latencies, 0.5), 3),
+        hash_p99_ms=round(percentile(hash_latencies, 0.99), 3),
+        verify_p50_ms=round(percentile(verify_latencies, 0.5), 3),
+        verify_p99_ms=round(percentile(verify_latencies, 0.99), 3),
+        signins_per_second=round(len(verify_latencies) / elapsed, 1),
+    )
+
+
+def recommend(
+    measurements: list[Measurement], target_p99: float, target_rps: float
+) -> Measurement | None:
+    """Pick the most rounds within targets, the least workers as a tie-breaker"""
+    suitable = [
+        measurement
+        for measurement in measurements
+        if measurement.verify_p99_ms <= target_p99
+        and measurement.signins_per_second >= target_rps
+    ]
+    if len(suitable) == 0:
+        return None
+    return max(
+        suitable, key=lambda measurement: (measurement.rounds, -measurement.max_workers)
+    )
+
+
+async def calibrate(arguments: Namespace) -> dict[str, Any]:
+    base_policy: PasswordHashingPolicy = configured_password_hasher.policy
+    default_rounds: int = (
+        base_policy.rounds
+        or get_crypt_context(base_policy).handler(base_policy.scheme).default_rounds
+    )
+    rounds_options: list[int] = arguments.rounds or [
+        default_rounds // 2,
+        default_rounds,
+        default_rounds * 2,
+    ]
+
+    measurements: list[Measurement] = []
+    for rounds in rounds_options:
+        policy = replace(base_policy, rounds=rounds)
+        for backend in arguments.backends:
+            for max_workers in arguments.workers:
+                measurement = await measure(
+                    policy, backend, max_workers, requests=arguments.requests
+                )
+                measurements.append(measurement)
+                print(measurement, file=sys.stderr)  # noqa: T201  # progress
+
+    recommendation = recommend(
+        measurements, target_p99=arguments.target_p99, target_rps=arguments.target_rps
+    )
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "host": {
+            "cpu_count": os.cpu_count(),
+            "machine": platform.machine(),
+            "python": platform.python_version(),
+        },
+        "scheme": base_policy.scheme,
+        "targets": {
+            "verify_p99_ms": arguments.target_p99,
+            "signins_per_second": arguments.target_rps,
+        },
+        "measurements": [asdict(measurement) for measurement in measurements],
+        "recommendation": (
+            None
+            if recommendation is None
+            else {
+                "measurement": asdict(recommendation),
+                "settings": {
+                    "PASSWORD_HASHING__SCHEME": base_policy.scheme,
+                    "PASSWORD_HASHING__ROUNDS": recommendation.rounds,
+                    "PASSWORD_HASHING__BACKEND": recommendation.backend.value,
+                    "PASSWORD_HASHING__MAX_WORKERS": recommendation.max_workers,
+                },
+            }
+        ),
+    }
+
+
+if __name__ == "__main__":
+    cpu_count = os.cpu_count() or 1
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--target-p99", type=float, default=250, help="in ms")
+    parser.add_argument("--target-rps", type=float, default=10)
+    parser.add_argument("--rounds", type=int, nargs="*")
+    parser.add_argument(
+        "--backends",
+        type=PasswordHashingBackend,
+        nargs="*",
+        default=list(PasswordHashingBackend),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="*",
+        default=sorted({1, max(cpu_count // 2, 1), cpu_count}),
+    )
+    parser.add_argument("--requests", type=int, default=100)
+    print(json.dumps(run(calibrate(parser.parse_args())), indent=2))  # noqa: T201
@@ -2,12 +2,14 @@ from __future__ import annotations
 
 import asyncio
 import sys
-from collections.abc import Sequence
+from collections.abc import AsyncIterator, Callable, Sequence
+from contextlib import asynccontextmanager
 from contextvars import ContextVar
 from typing import Any, Self, TypeVar
 
-from sqlalchemy import Select, select
+from sqlalchemy import Select, event, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session as SyncSession
 
 if sys.platform == "win32":
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
@@ -26,6 +28,23 @@ class DBController:
             raise ValueError("Session not initialized")
         return session
 
+    def on_commit(self, callback: Callable[[], Any]) -> None:
+        """Schedule a callback to run after the current transaction is committed"""
+        self.session.info.setdefault("on_commit", []).append(callback)
+
+    @asynccontextmanager
+    async def savepoint(self) -> AsyncIterator[None]:
+        """
+        Roll back only the statements of the block if it fails. In autocommit
+        mode there is no transaction to save, so the block is run as is
+        """
+        options = self.session.get_bind().get_execution_options()
+        if options.get("isolation_level") == "AUTOCOMMIT":
+            yield
+            return
+        async with self.session.begin_nested():
+            yield
+
     async def get_first(self, stmt: Select[Any]) -> Any | None:
         return (await self.session.execute(stmt)).scalars().first()
 
@@ -37,10 +56,40 @@ class DBController:
     ) -> Sequence[Any]:
         return await self.get_all(stmt.offset(offset).limit(limit))
 
+    async def get_keyset_paginated(
+        self,
+        stmt: Select[Any],
+        keys: Sequence[Any],
+        after: Sequence[Any] | None = None,
+        limit: int | None = None,
+    ) -> Sequence[Any]:
+        """
+        Order by ``keys`` (descending) and return up to ``limit`` rows
+        which come after the row with ``after`` values of those ``keys``.
+        Unlike OFFSET, skipped rows are never read, when ``keys`` are indexed
+        """
+        if after is not None:
+            stmt = stmt.filter(tuple_(*keys) < tuple_(*after))
+        stmt = stmt.order_by(*(key.desc() for key in keys))
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return await self.get_all(stmt)
+
 
 db: DBController = DBController()
 
 
+@event.listens_for(SyncSession, "after_commit")
+def run_on_commit_callbacks(session: SyncSession) -> None:
+    for callback in session.info.pop("on_commit", ()):
+        callback()
+
+
+@event.listens_for(SyncSession, "after_soft_rollback")
+def drop_on_commit_callbacks(session: SyncSession, _: Any) -> None:
+    session.info.pop("on_commit", None)
+
+
 class MappingBase:
     @classmethod
     async def create(cls, **kwargs: Any) -> Self:
@@ -81,6 +130,21 @@ class MappingBase:
             limit=limit,
         )
 
+    @classmethod
+    async def find_keyset_paginated_by_kwargs(
+        cls,
+        keys: Sequence[Any],
+        after: Sequence[Any] | None = None,
+        limit: int | None = None,
+        **kwargs: Any,
+    ) -> Sequence[Self]:
+        return await db.get_keyset_paginated(
+            cls.select_by_kwargs(**kwargs),
+            keys=keys,
+            after=after,
+            limit=limit,
+        )
+
     def update(self, **kwargs: Any) -> None:
         for key, value in kwargs.items():
             setattr(self, key, value)
@@ -0,0 +1,58 @@
+from collections.abc import Collection
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.common.sqlalchemy_ext import session_context
+
+
+class DatabaseSessionMiddleware:
+    """
+    Pure ASGI replacement for a ``BaseHTTPMiddleware``-based session middleware
+
+    Opens a database session per request and commits it right before
+    the response is started, so clients never observe uncommitted changes.
+    Requests with methods from ``read_only_methods`` use ``read_sessionmaker``
+    (if provided), paths starting with any of ``skipped_paths`` and OPTIONS
+    requests are passed through without a session.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sessionmaker: async_sessionmaker,  # type: ignore[type-arg]
+        read_sessionmaker: async_sessionmaker | None = None,  # type: ignore[type-arg]
+        read_only_methods: Collection[str] = ("GET", "HEAD"),
+        skipped_paths: tuple[str, ...] = (),
+    ) -> None:
+        self.app = app
+        self.sessionmaker = sessionmaker
+        self.read_sessionmaker = read_sessionmaker
+        self.read_only_methods = frozenset(read_only_methods)
+        self.skipped_paths = skipped_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] == "OPTIONS"
+            or scope["path"].startswith(self.skipped_paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        sessionmaker = self.sessionmaker
+        if (
+            self.read_sessionmaker is not None
+            and scope["method"] in self.read_only_methods
+        ):
+            sessionmaker = self.read_sessionmaker
+
+        async with sessionmaker() as session:
+            session_context.set(session)
+
+            async def send_after_commit(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    await session.commit()
+                await send(message)
+
+            await self.app(scope, receive, send_after_commit)
@@ -1,20 +1,36 @@
 from asyncio import AbstractEventLoop, get_running_loop
-from collections.abc import AsyncIterator, Awaitable, Callable
+from collections.abc import AsyncIterator
 from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Final
 
 from aio_pika import connect_robust
 from aio_pika.abc import AbstractRobustConnection
 from fastapi import FastAPI
 from fastapi.openapi.docs import get_swagger_ui_html
-from starlette.requests import Request
 from starlette.responses import Response
 from starlette.staticfiles import StaticFiles
 
 from app import pochta, supbot, users
 from app.common.bridges.config_bdg import public_users_bridge
-from app.common.config import Base, engine, pochta_producer, sessionmaker, settings
-from app.common.sqlalchemy_ext import session_context
+from app.common.config import (
+    Base,
+    autocommit_sessionmaker,
+    engine,
+    pochta_producer,
+    sessionmaker,
+    sessions_producer,
+    settings,
+)
 from app.common.starlette_cors_ext import CorrectCORSMiddleware
+from app.common.starlette_sqlalchemy_ext import DatabaseSessionMiddleware
+
+NO_DATABASE_PATHS: Final[tuple[str, ...]] = (
+    "/static/",
+    "/docs",
+    "/openapi.json",
+    # proxy auth opens database sessions by itself, and only on cache misses
+    "/proxy/",
+)
 
 
 async def reinit_database() -> None:  # pragma: no cover
@@ -27,6 +43,7 @@ async def connect_rabbit() -> AbstractRobustConnection:
     loop: AbstractEventLoop = get_running_loop()
     connection = await connect_robust(settings.mq_dsn, loop=loop)
     await pochta_producer.connect(connection)
+    await sessions_producer.connect(connection)
     return connection
 
 
@@ -38,7 +55,7 @@ async def lifespan(_: FastAPI) -> AsyncIterator[None]:
     rabbit_connection = await connect_rabbit()
 
     async with AsyncExitStack() as stack:
-        await stack.enter_async_context(users.lifespan())
+        await stack.enter_async_context(users.lifespan(rabbit_connection))
         await stack.enter_async_context(supbot.lifespan())
         await stack.enter_async_context(pochta.lifespan())
 
@@ -81,17 +98,16 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    DatabaseSessionMiddleware,
+    sessionmaker=sessionmaker,
+    # read routes can only write a single row (session renewal), so autocommit is safe
+    read_sessionmaker=(
+        autocommit_sessionmaker if settings.postgres_autocommit_reads else None
+    ),
+    skipped_paths=NO_DATABASE_PATHS,
+)
 
 app.include_router(users.api_router)
 app.include_router(supbot.api_router)
 app.include_router(pochta.api_router)
-
-
-@app.middleware("http")
-async def database_session_middleware(
-    request: Request,
-    call_next: Callable[[Request], Awaitable[Response]],
-) -> Response:
-    async with sessionmaker.begin() as session:
-        session_context.set(session)
-        return await call_next(request)
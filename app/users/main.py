@@ -1,19 +1,25 @@
+import asyncio
 from collections.abc import AsyncIterator
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
+from aio_pika.abc import AbstractConnection
 from fastapi import Depends
+from starlette.routing import Route
 
-from app.common.config import settings
+from app.common.config import password_hasher, settings
 from app.common.fastapi_ext import APIRouterExt
 from app.users.routes import (
     avatar_rst,
     current_user_rst,
     email_confirmation_rst,
     forms_rst,
+    introspection_mub,
     onboarding_rst,
+    password_hashing_mub,
     password_reset_rst,
     proxy_rst,
     reglog_rst,
+    session_revocation_mub,
     sessions_mub,
     sessions_rst,
     users_mub,
@@ -21,6 +27,8 @@ from app.users.routes import (
 )
 from app.users.utils.authorization import authorize_user
 from app.users.utils.mub import MUBProtection
+from app.users.utils.session_cache import sessions_consumer
+from app.users.utils.session_sweeper import run_session_sweeper
 
 outside_router = APIRouterExt(prefix="/api")
 outside_router.include_router(reglog_rst.router)
@@ -40,15 +48,48 @@ authorized_router.include_router(sessions_rst.router, prefix="/sessions")
 mub_router = APIRouterExt(prefix="/mub", dependencies=[MUBProtection])
 mub_router.include_router(users_mub.router, prefix="/users")
 mub_router.include_router(sessions_mub.router, prefix="/users/{user_id}/sessions")
+mub_router.include_router(introspection_mub.router, prefix="/sessions/introspection")
+mub_router.include_router(session_revocation_mub.router, prefix="/sessions/revocation")
+mub_router.include_router(password_hashing_mub.router, prefix="/password-hashing")
 
 api_router = APIRouterExt()
 api_router.include_router(outside_router)
 api_router.include_router(authorized_router)
 api_router.include_router(mub_router)
-api_router.include_router(proxy_rst.router)
+api_router.routes.append(
+    Route(
+        "/proxy/auth/",
+        proxy_rst.ProxyAuthApp(optional=False),
+        methods=["GET"],
+        include_in_schema=False,
+    )
+)
+api_router.routes.append(
+    Route(
+        "/proxy/optional-auth/",
+        proxy_rst.ProxyAuthApp(optional=True),
+        methods=["GET"],
+        include_in_schema=False,
+    )
+)
 
 
 @asynccontextmanager
-async def lifespan() -> AsyncIterator[None]:
+async def lifespan(rabbit_connection: AbstractConnection) -> AsyncIterator[None]:
     settings.avatars_path.mkdir(exist_ok=True)
+    await sessions_consumer.connect(rabbit_connection)
+    await password_hasher.start()
+
+    sweeper_task = asyncio.create_task(
+        run_session_sweeper(
+            interval=settings.session_sweeper.interval,
+            batch_size=settings.session_sweeper.batch_size,
+        )
+    )
+
     yield
+
+    sweeper_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await sweeper_task
+    password_hasher.shutdown()
@@ -1,14 +1,46 @@
 from collections.abc import Sequence
 from datetime import datetime, timedelta
+from functools import partial
 from typing import Any, ClassVar, Self
 
+from psycopg.errors import SerializationFailure
 from pydantic_marshals.sqlalchemy import MappedModel
-from sqlalchemy import CHAR, ForeignKey, Index, delete, select, update
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import (
+    DDL,
+    ForeignKey,
+    Index,
+    LargeBinary,
+    and_,
+    any_,
+    delete,
+    event,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import (
+    Mapped,
+    column_property,
+    joinedload,
+    mapped_column,
+    relationship,
+)
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.common.config import Base, token_generator
+from app.common.cryptography import hash_token
 from app.common.sqlalchemy_ext import db
 from app.users.models.users_db import User
+from app.users.utils.session_cache import (
+    revoke_session,
+    revoke_sessions,
+    revoke_user_sessions,
+)
 
 
 class Session(Base):
@@ -17,28 +49,56 @@ class Session(Base):
 
     expiry_timeout: ClassVar[timedelta] = timedelta(days=7)
     renew_period_length: ClassVar[timedelta] = timedelta(days=3)
+    renewal_grace_period: ClassVar[timedelta] = timedelta(minutes=1)
 
     max_concurrent_sessions: ClassVar[int] = 10
     max_history_sessions: ClassVar[int] = 20
     max_history_timedelta: ClassVar[timedelta] = timedelta(days=7)
 
+    # bulk revocations are split into transactions of this size, to hold locks shortly
+    revocation_batch_size: ClassVar[int] = 1000
+
+    # the table is partitioned by expiry, see :py:mod:`app.users.utils.session_partitions`
+    partition_period: ClassVar[timedelta] = timedelta(weeks=1)
+
     @staticmethod
     def generate_expiry() -> datetime:
         return datetime.utcnow() + Session.expiry_timeout
 
-    id: Mapped[int] = mapped_column(primary_key=True)
+    # primary key of the table is (id, expiry), as the partition key has to be in it
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
 
     user_id: Mapped[int] = mapped_column(ForeignKey(User.id, ondelete="CASCADE"))
     user: Mapped[User] = relationship(passive_deletes=True)
 
-    # Security
-    token: Mapped[str] = mapped_column(CHAR(token_generator.token_length))
-    expiry: Mapped[datetime] = mapped_column(default=generate_expiry)
+    # Security (only sha256 digests of tokens are stored, see :py:attr:`token`)
+    token_digest: Mapped[bytes] = mapped_column(LargeBinary(32))
+    expiry: Mapped[datetime] = mapped_column(primary_key=True, default=generate_expiry)
     disabled: Mapped[bool] = mapped_column(default=False)
 
+    # Token replaced by the last renewal, accepted for :py:attr:`renewal_grace_period`
+    previous_token_digest: Mapped[bytes | None] = mapped_column(LargeBinary(32))
+    previous_token_expiry: Mapped[datetime | None] = mapped_column()
+
+    @property
+    def token(self) -> str:
+        """
+        The raw token, only known for sessions created or renewed
+        in the current process, as the database only has its digest
+        """
+        token: str | None = getattr(self, "raw_token", None)
+        if token is None:
+            raise AttributeError("Raw token is only known for new or renewed sessions")
+        return token
+
+    @token.setter
+    def token(self, token: str) -> None:
+        self.raw_token = token
+        self.token_digest = hash_token(token)
+
     @property
     def invalid(self) -> bool:  # noqa: FNE005
-        return self.disabled or self.expiry < datetime.utcnow()
+        return self.disabled or self.revoked or self.expiry < datetime.utcnow()
 
     # User info
     created: Mapped[datetime] = mapped_column(default=datetime.utcnow)
@@ -47,9 +107,42 @@ class Session(Base):
     # Admin
     mub: Mapped[bool] = mapped_column(default=False)
 
+    # all (non-mub) sessions of a user are revoked at once by bumping
+    # :py:attr:`User.session_epoch`, without touching the sessions
+    epoch: Mapped[int] = mapped_column(default=0, server_default="0")
+    revoked: Mapped[bool] = column_property(
+        and_(
+            mub.is_(False),
+            select(User.session_epoch > epoch)
+            .where(User.id == user_id)
+            .scalar_subquery(),
+        )
+    )
+
     __table_args__ = (
-        Index("hash_index_session_token", token, postgresql_using="hash"),
+        # uniqueness isn't enforced: a unique constraint has to include the partition
+        # key, while tokens have enough randomness (40 bytes) to never collide
+        Index("hash_index_session_token_digest", token_digest, postgresql_using="hash"),
+        Index(
+            "hash_index_session_previous_token_digest",
+            previous_token_digest,
+            postgresql_using="hash",
+        ),
+        # history cleanup & sweeping, any session for a user by expiry
+        Index("index_session_user_id_expiry", user_id, expiry.desc()),
+        # listing sessions (mub & regular separately)
+        Index("index_session_user_id_mub_expiry", user_id, mub, expiry.desc()),
+        # concurrent sessions cleanup & disabling, only not disabled sessions
+        Index(
+            "partial_index_session_active_user_id_mub_expiry",
+            user_id,
+            mub,
+            expiry.desc(),
+            postgresql_where=disabled.is_(False),
+        ),
+        {"postgresql_partition_by": "RANGE (expiry)"},
     )
+    __mapper_args__ = {"primary_key": [id]}
 
     FullModel = MappedModel.create(
         columns=[id, created, expiry, disabled],
@@ -57,110 +150,354 @@ class Session(Base):
     )
     MUBFullModel = FullModel.extend(columns=[mub])
 
+    @property
+    def renewal_deadline(self) -> datetime:
+        return self.expiry - self.renew_period_length
+
     def is_renewal_required(self) -> bool:
-        return self.expiry - self.renew_period_length < datetime.utcnow()
+        return self.renewal_deadline < datetime.utcnow()
 
-    def renew(self) -> None:
-        self.token = token_generator.generate_token()
-        self.expiry = self.generate_expiry()
+    async def renew(self) -> bool:
+        """
+        Rotate the token unless someone has already done it concurrently
+        (compare-and-set on the token, no locks are taken in advance)
+
+        :return: whether this call has rotated the token
+        """
+        token = token_generator.generate_token()
+        values = {
+            "token_digest": hash_token(token),
+            "expiry": self.generate_expiry(),
+            "previous_token_digest": self.token_digest,
+            "previous_token_expiry": datetime.utcnow() + self.renewal_grace_period,
+        }
+        try:
+            # renewal moves the row into another partition, so a concurrent
+            # renewal fails on the moved row instead of matching no rows
+            async with db.savepoint():
+                result = await db.session.execute(
+                    update(type(self))
+                    .where(
+                        type(self).id == self.id,
+                        type(self).token_digest == self.token_digest,
+                    )
+                    .values(**values)
+                    .execution_options(synchronize_session=False)
+                )
+        except DBAPIError as error:
+            if isinstance(error.orig, SerializationFailure):
+                return False
+            raise
+        if result.rowcount == 0:  # type: ignore[attr-defined]
+            return False
+        for key, value in values.items():
+            set_committed_value(self, key, value)
+        self.raw_token = token
+        return True
+
+    def disable(self) -> None:
+        self.disabled = True
+        db.on_commit(
+            partial(revoke_session, "session-disabled", self.token_digest, self.id)
+        )
+
+    async def delete(self) -> None:
+        await super().delete()
+        db.on_commit(
+            partial(revoke_session, "session-deleted", self.token_digest, self.id)
+        )
 
     @classmethod
     async def create(cls, **kwargs: Any) -> Self:
-        if kwargs.get("token") is None:
-            token = token_generator.generate_token()
-            if (await Session.find_first_by_kwargs(token=token)) is not None:
-                raise RuntimeError("Token collision happened (!wow!)")
-            kwargs["token"] = token
-        return await super().create(**kwargs)
+        """Insert a session in a single statement, returning it with a new token"""
+        token: str = kwargs.pop("token", None) or token_generator.generate_token()
+        kwargs.setdefault(
+            "epoch",
+            select(User.session_epoch)
+            .where(User.id == kwargs["user_id"])
+            .scalar_subquery(),
+        )
+        result = await db.session.execute(
+            insert(cls).values(token_digest=hash_token(token), **kwargs).returning(cls)
+        )
+        session = result.scalar_one()
+        session.raw_token = token
+        # sessions are created in the current epoch, no need to load it
+        set_committed_value(session, "revoked", False)
+        return session
+
+    @classmethod
+    async def find_first_by_token(cls, token: str) -> Self | None:
+        """
+        Find a session by token together with its user in a single query.
+        Tokens replaced by a renewal are accepted during the grace period
+        """
+        token_digest = hash_token(token)
+        return await db.get_first(
+            select(cls)
+            .where(
+                or_(
+                    cls.token_digest == token_digest,
+                    and_(
+                        cls.previous_token_digest == token_digest,
+                        cls.previous_token_expiry > datetime.utcnow(),
+                    ),
+                )
+            )
+            .options(joinedload(cls.user))
+        )
+
+    @classmethod
+    async def find_all_by_tokens(cls, tokens: Sequence[str]) -> Sequence[Self]:
+        """
+        Find sessions for a batch of tokens with their users in a single query,
+        accepting previous tokens same as :py:meth:`find_first_by_token`
+        """
+        token_digests = literal(
+            [hash_token(token) for token in tokens], ARRAY(LargeBinary(32))
+        )
+        return await db.get_all(
+            select(cls)
+            .where(
+                or_(
+                    cls.token_digest == any_(token_digests),
+                    and_(
+                        cls.previous_token_digest == any_(token_digests),
+                        cls.previous_token_expiry > datetime.utcnow(),
+                    ),
+                )
+            )
+            .options(joinedload(cls.user))
+        )
+
+    def get_accepted_token_digests(self) -> list[bytes]:
+        """Digests of the current token & the previous one during the grace period"""
+        if (
+            self.previous_token_digest is None
+            or self.previous_token_expiry is None
+            or self.previous_token_expiry <= datetime.utcnow()
+        ):
+            return [self.token_digest]
+        return [self.token_digest, self.previous_token_digest]
 
     @classmethod
     async def find_by_user(
         cls,
         user_id: int,
         exclude_id: int | None = None,
+        after: tuple[datetime, int] | None = None,
+        limit: int | None = None,
     ) -> Sequence[Self]:
-        stmt = (
-            select(cls)
-            .filter_by(user_id=user_id, mub=False)
-            .order_by(cls.expiry.desc())
-        )
+        """List non-mub sessions, paginated by (expiry, id), newest first"""
+        stmt = select(cls).filter_by(user_id=user_id, mub=False)
         if exclude_id is not None:
             stmt = stmt.filter(cls.id != exclude_id)
-        return await db.get_all(stmt)
+        return await db.get_keyset_paginated(
+            stmt, keys=(cls.expiry, cls.id), after=after, limit=limit
+        )
+
+    @classmethod
+    async def find_all_by_user(
+        cls,
+        user_id: int,
+        after: tuple[datetime, int] | None = None,
+        limit: int | None = None,
+    ) -> Sequence[Self]:
+        """List all sessions, paginated by (expiry, id), newest first"""
+        return await cls.find_keyset_paginated_by_kwargs(
+            keys=(cls.expiry, cls.id), after=after, limit=limit, user_id=user_id
+        )
 
     async def disable_all_other(self) -> None:
+        """
+        Revoke all other non-mub sessions by starting a new epoch for the user
+        and moving this session into it, instead of updating every session
+        """
+        epoch = await db.session.scalar(
+            update(User)
+            .where(User.id == self.user_id)
+            .values(session_epoch=User.session_epoch + 1)
+            .returning(User.session_epoch)
+        )
         await db.session.execute(
             update(type(self))
-            .where(
-                type(self).id != self.id,
-                type(self).mub.is_(False),
-                type(self).user_id == self.user_id,
-                type(self).disabled.is_(False),
-            )
-            .values(disabled=True)
-        )
-
-    @classmethod
-    async def cleanup_concurrent_by_user(cls, user_id: int) -> None:
-        """Disable sessions above :py:attr:`max_concurrent_sessions`"""
-        first_outside_limit: Self | None = await db.get_first(
-            select(cls)
-            .filter(cls.disabled.is_(False), cls.expiry >= datetime.utcnow())
-            .filter_by(user_id=user_id, mub=False)
-            .order_by(cls.expiry.desc())
-            .offset(cls.max_concurrent_sessions)
+            # not by expiry, the session could've been renewed concurrently
+            .where(type(self).id == self.id)
+            .values(epoch=epoch)
+            .execution_options(synchronize_session=False)
         )
-        if first_outside_limit is not None:
-            await db.session.execute(
-                update(cls)
-                .where(
-                    cls.user_id == user_id,
-                    cls.mub.is_(False),
-                    cls.expiry <= first_outside_limit.expiry,
-                    cls.disabled.is_(False),
-                )
-                .values(disabled=True)
+        set_committed_value(self, "epoch", epoch)
+        db.on_commit(
+            partial(
+                revoke_user_sessions,
+                "user-sessions-disabled",
+                self.user_id,
+                exclude_session_id=self.id,
             )
+        )
 
     @classmethod
-    async def cleanup_history_by_user(cls, user_id: int) -> None:
+    async def cleanup(cls, user_ids: Sequence[int]) -> tuple[int, int]:
         """
-        Delete sessions for the list of invalid ones, which are
-        above :py:attr:`max_history_sessions` by number in the list
-        or expired more than :py:attr:`max_history_timedelta` ago
+        Apply both session limits for ``user_ids`` in a single statement:
+        disable sessions above :py:attr:`max_concurrent_sessions` and delete
+        sessions (valid or not) above :py:attr:`max_history_sessions` or
+        expired more than :py:attr:`max_history_timedelta` ago
+
+        Expired sessions are only deleted from the default partition,
+        periodic partitions are dropped as a whole once all of their
+        sessions are old enough, see :py:mod:`app.users.utils.session_partitions`
+
+        :return: the numbers of disabled & deleted sessions
         """
+        now = datetime.utcnow()
+        is_active = and_(
+            cls.disabled.is_(False),
+            cls.expiry >= now,
+            cls.mub.is_(False),
+            cls.revoked.is_(False),
+        )
+        in_default_partition = literal_column("tableoid") == func.to_regclass(
+            f"{cls.__table__.fullname}_default"  # type: ignore[attr-defined]
+        )
+        ranked = (
+            select(
+                cls.id,
+                cls.expiry,
+                is_active.label("active"),
+                in_default_partition.label("in_default_partition"),
+                func.row_number()
+                .over(partition_by=cls.user_id, order_by=cls.expiry.desc())
+                .label("history_rank"),
+                func.row_number()
+                .over(partition_by=(cls.user_id, is_active), order_by=cls.expiry.desc())
+                .label("concurrent_rank"),
+            )
+            .filter(cls.user_id.in_(user_ids))
+            .cte("ranked")
+        )
 
-        max_outside_timestamp = datetime.utcnow() - cls.max_history_timedelta
-        outside_limit: datetime = (
-            await db.get_first(
-                select(cls.expiry)
-                .filter(
-                    cls.expiry > max_outside_timestamp
-                )  # if greater, fallback to max
-                .filter_by(user_id=user_id)
-                .order_by(cls.expiry.desc())
-                .offset(cls.max_history_sessions)
+        # a cte is evaluated once, so both statements see the same rows
+        history = (
+            select(ranked.c.id, ranked.c.active)
+            .filter(
+                or_(
+                    and_(
+                        ranked.c.in_default_partition,
+                        ranked.c.expiry <= now - cls.max_history_timedelta,
+                    ),
+                    ranked.c.history_rank > cls.max_history_sessions,
+                )
             )
-            or max_outside_timestamp
+            .cte("history")
+        )
+        concurrent = select(ranked.c.id).filter(
+            ranked.c.active,
+            ranked.c.concurrent_rank > cls.max_concurrent_sessions,
+            ranked.c.id.not_in(select(history.c.id)),
         )
 
-        await db.session.execute(
-            delete(cls).where(
-                cls.user_id == user_id,
-                cls.expiry <= outside_limit,
+        deleted = (
+            delete(cls)
+            .where(cls.id.in_(select(history.c.id)))
+            .returning(cls.id)
+            .cte("deleted")
+        )
+        disabled = (
+            update(cls)
+            .where(cls.id.in_(concurrent))
+            .values(disabled=True)
+            .returning(cls.id)
+            .cte("disabled")
+        )
+        result = await db.session.execute(
+            select(
+                disabled.c.id,
+                literal(True).label("disabled"),
+                literal(True).label("active"),
+            ).union_all(
+                select(
+                    deleted.c.id, literal(False).label("disabled"), history.c.active
+                ).join(history, history.c.id == deleted.c.id)
             )
         )
+        rows = result.all()
+
+        # only sessions which were valid until now can be cached
+        cls.revoke_sessions_on_commit(
+            "sessions-disabled", [row.id for row in rows if row.disabled]
+        )
+        cls.revoke_sessions_on_commit(
+            "sessions-deleted",
+            [row.id for row in rows if row.active and not row.disabled],
+        )
+        disabled_count = sum(1 for row in rows if row.disabled)
+        return disabled_count, len(rows) - disabled_count
 
     @classmethod
     async def cleanup_by_user(cls, user_id: int) -> None:
-        await cls.cleanup_concurrent_by_user(user_id)
-        await cls.cleanup_history_by_user(user_id)
+        await cls.cleanup(user_ids=[user_id])
+
+    @staticmethod
+    def revoke_sessions_on_commit(event_name: str, session_ids: Sequence[int]) -> None:
+        if len(session_ids) != 0:
+            db.on_commit(partial(revoke_sessions, event_name, session_ids))
 
     @classmethod
-    async def find_active_mub_session(cls, user_id: int) -> Self | None:
-        return await db.get_first(
-            select(cls)
-            .filter(cls.disabled.is_(False), cls.expiry > datetime.utcnow())
-            .filter_by(user_id=user_id)
-            .order_by(cls.expiry.desc())
+    async def revoke_matching(
+        cls,
+        batch_size: int,
+        after_id: int = 0,
+        delete_sessions: bool = False,
+        created_before: datetime | None = None,
+        cross_site: bool | None = None,
+        mub: bool | None = None,
+    ) -> Sequence[tuple[int, int]]:
+        """
+        Disable (or delete) the first ``batch_size`` sessions by id after
+        ``after_id``, which match all of the given criteria, in a single statement
+
+        :return: ids & user ids of affected sessions
+        """
+        matching = select(cls.id).filter(cls.id > after_id)
+        if not delete_sessions:
+            matching = matching.filter(cls.disabled.is_(False))
+        if created_before is not None:
+            matching = matching.filter(cls.created < created_before)
+        if cross_site is not None:
+            matching = matching.filter(cls.cross_site.is_(cross_site))
+        if mub is not None:
+            matching = matching.filter(cls.mub.is_(mub))
+        matching = matching.order_by(cls.id).limit(batch_size)
+
+        if delete_sessions:
+            result = await db.session.execute(
+                delete(cls)
+                .where(cls.id.in_(matching))
+                .returning(cls.id, cls.user_id)
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            result = await db.session.execute(
+                update(cls)
+                .where(cls.id.in_(matching))
+                .values(disabled=True)
+                .returning(cls.id, cls.user_id)
+                .execution_options(synchronize_session=False)
+            )
+        rows = result.tuples().all()
+        cls.revoke_sessions_on_commit(
+            "sessions-deleted" if delete_sessions else "sessions-disabled",
+            [session_id for session_id, _ in rows],
         )
+        return rows
+
+
+# catches rows outside of periodic partitions, so that inserts never fail
+event.listen(
+    Session.__table__,
+    "after_create",
+    DDL(  # type: ignore[no-untyped-call]
+        "CREATE TABLE %(fullname)s_default PARTITION OF %(fullname)s DEFAULT"
+    ),
+)
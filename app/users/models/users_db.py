@@ -1,15 +1,18 @@
 import enum
+from collections.abc import Sequence
 from datetime import datetime, timedelta
+from functools import partial
 from pathlib import Path
-from typing import Annotated, ClassVar
+from typing import Annotated, Any, ClassVar
 
-from passlib.handlers.pbkdf2 import pbkdf2_sha256
-from pydantic import AfterValidator, Field, StringConstraints
+from pydantic import Field, StringConstraints
 from pydantic_marshals.sqlalchemy import MappedModel
-from sqlalchemy import CHAR, Enum, Index, String
+from sqlalchemy import CHAR, Enum, Index, String, select, update
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.common.config import Base, settings, token_generator
+from app.common.config import Base, password_hasher, settings, token_generator
+from app.common.sqlalchemy_ext import db
+from app.users.utils.session_cache import revoke_user_sessions
 
 
 class OnboardingStage(str, enum.Enum):
@@ -26,8 +29,8 @@ class User(Base):
     email_confirmation_resend_timeout: ClassVar[timedelta] = timedelta(minutes=10)
 
     @staticmethod
-    def generate_hash(password: str) -> str:
-        return pbkdf2_sha256.hash(password)
+    async def generate_hash(password: str) -> str:
+        return await password_hasher.hash(password)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     email: Mapped[str] = mapped_column(String(100))
@@ -42,6 +45,9 @@ class User(Base):
     reset_token: Mapped[str | None] = mapped_column(CHAR(token_generator.token_length))
     last_password_change: Mapped[datetime] = mapped_column(default=datetime.utcnow)
 
+    # sessions from previous epochs are revoked, see :py:attr:`Session.revoked`
+    session_epoch: Mapped[int] = mapped_column(default=0, server_default="0")
+
     email_confirmed: Mapped[bool] = mapped_column(default=False)
     allowed_confirmation_resend: Mapped[datetime] = mapped_column(
         default=datetime.utcnow
@@ -53,9 +59,7 @@ class User(Base):
         Index("hash_index_users_token", reset_token, postgresql_using="hash"),
     )
 
-    PasswordType = Annotated[
-        str, Field(min_length=6, max_length=100), AfterValidator(generate_hash)
-    ]
+    PasswordType = Annotated[str, Field(min_length=6, max_length=100)]
     DisplayNameRequiredType = Annotated[
         str,
         StringConstraints(strip_whitespace=True),
@@ -94,8 +98,38 @@ class User(Base):
         columns=[(display_name, DisplayNameType), theme, onboarding_stage]
     ).as_patch()
 
-    def is_password_valid(self, password: str) -> bool:
-        return pbkdf2_sha256.verify(password, self.password)
+    def update(self, **kwargs: Any) -> None:
+        if kwargs.get("username", self.username) != self.username:
+            db.on_commit(partial(revoke_user_sessions, "user-updated", self.id))
+        super().update(**kwargs)
+
+    async def delete(self) -> None:
+        await super().delete()
+        db.on_commit(partial(revoke_user_sessions, "user-deleted", self.id))
+
+    async def is_password_valid(self, password: str) -> bool:
+        return await password_hasher.verify(password, self.password)
+
+    @classmethod
+    async def find_ids_after(cls, after_id: int, limit: int) -> Sequence[int]:
+        """List user ids in batches (by primary key), for sweeping all users"""
+        return await db.get_all(
+            select(cls.id).filter(cls.id > after_id).order_by(cls.id).limit(limit)
+        )
+
+    def is_password_hash_outdated(self) -> bool:
+        return password_hasher.needs_update(self.password)
+
+    @classmethod
+    async def replace_password_hash(
+        cls, user_id: int, password_hash: str, new_password_hash: str
+    ) -> None:
+        """Replace the hash unless the password has been changed in the meantime"""
+        await db.session.execute(
+            update(cls)
+            .where(cls.id == user_id, cls.password == password_hash)
+            .values(password=new_password_hash)
+        )
 
     def is_email_confirmation_resend_allowed(self) -> bool:
         return self.allowed_confirmation_resend < datetime.utcnow()
@@ -115,11 +149,13 @@ class User(Base):
             self.reset_token = token_generator.generate_token()
         return self.reset_token
 
-    def change_password(self, password: str) -> None:
-        if not self.is_password_valid(password):
-            self.last_password_change = datetime.utcnow()
-        self.password = self.generate_hash(password)
+    async def change_password(self, password: str) -> None:
+        # callers make sure that the new password differs from the current one
+        self.password = await self.generate_hash(password)
+        self.last_password_change = datetime.utcnow()
 
-    def reset_password(self, password: str) -> None:
-        self.change_password(password)
+    async def reset_password(self, password: str) -> None:
+        if not await self.is_password_valid(password):
+            self.last_password_change = datetime.utcnow()
+        self.password = await self.generate_hash(password)
         self.reset_token = None
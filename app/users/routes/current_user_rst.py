@@ -10,6 +10,7 @@ from app.users.models.users_db import User
 from app.users.utils.authorization import AuthorizedSession, AuthorizedUser
 from app.users.utils.confirmations import EmailResendResponses
 from app.users.utils.magic import include_responses
+from app.users.utils.password_hashing import PasswordHashingAdmission
 from app.users.utils.users import (
     UserEmailResponses,
     UsernameResponses,
@@ -60,11 +61,12 @@ class EmailChangeResponses(Responses):
 @router.put(
     "/email/",
     response_model=User.FullModel,
+    dependencies=[PasswordHashingAdmission],
     responses=EmailChangeResponses.responses(),
     summary="Update current user's email",
 )
 async def change_user_email(user: AuthorizedUser, put_data: EmailChangeModel) -> User:
-    if not user.is_password_valid(password=put_data.password):
+    if not await user.is_password_valid(password=put_data.password):
         raise PasswordProtectedResponses.WRONG_PASSWORD.value
 
     if not await is_email_unique(put_data.new_email, user.username):
@@ -104,19 +106,21 @@ class PasswordChangeResponse(Responses):
 @router.put(
     "/password/",
     response_model=User.FullModel,
+    dependencies=[PasswordHashingAdmission],
     responses=PasswordChangeResponse.responses(),
     summary="Update current user's password",
 )
 async def change_user_password(
     user: AuthorizedUser, session: AuthorizedSession, put_data: PasswordChangeModel
 ) -> User:
-    if not user.is_password_valid(password=put_data.password):
+    if not await user.is_password_valid(password=put_data.password):
         raise PasswordProtectedResponses.WRONG_PASSWORD
 
-    if user.is_password_valid(put_data.new_password):
+    # the current password is verified above, no need to derive keys again
+    if put_data.new_password == put_data.password:
         raise PasswordChangeResponse.PASSWORD_MATCHES_CURRENT
 
-    user.change_password(put_data.new_password)
+    await user.change_password(put_data.new_password)
     await session.disable_all_other()
 
     return user
@@ -0,0 +1,52 @@
+from typing import Annotated
+
+from pydantic import BaseModel, Field
+
+from app.common.cryptography import hash_token
+from app.common.fastapi_ext import APIRouterExt
+from app.users.models.sessions_db import Session
+
+router = APIRouterExt(tags=["sessions mub"])
+
+
+class IntrospectionRequestModel(BaseModel):
+    tokens: Annotated[list[str], Field(min_length=1, max_length=1000)]
+
+
+class IntrospectionResultModel(BaseModel):
+    valid: bool
+    session_id: int | None = None
+    user_id: int | None = None
+    username: str | None = None
+
+
+@router.post(
+    "/",
+    response_model=list[IntrospectionResultModel],
+    summary="Validate a batch of session tokens (results follow the order of tokens)",
+)
+async def introspect_tokens(
+    data: IntrospectionRequestModel,
+) -> list[IntrospectionResultModel]:
+    sessions = {
+        token_digest: session
+        for session in await Session.find_all_by_tokens(data.tokens)
+        if not session.invalid
+        for token_digest in session.get_accepted_token_digests()
+    }
+
+    results: list[IntrospectionResultModel] = []
+    for token in data.tokens:
+        session = sessions.get(hash_token(token))
+        if session is None:
+            results.append(IntrospectionResultModel(valid=False))
+        else:
+            results.append(
+                IntrospectionResultModel(
+                    valid=True,
+                    session_id=session.id,
+                    user_id=session.user_id,
+                    username=session.user.username,
+                )
+            )
+    return results
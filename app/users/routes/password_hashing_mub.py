@@ -0,0 +1,14 @@
+from app.common.config import password_hasher
+from app.common.fastapi_ext import APIRouterExt
+from app.common.password_hashing import PasswordHashingMetrics
+
+router = APIRouterExt(tags=["password hashing mub"])
+
+
+@router.get(
+    "/metrics/",
+    response_model=PasswordHashingMetrics,
+    summary="Retrieve password hashing queue depth & wait time metrics",
+)
+async def retrieve_password_hashing_metrics() -> PasswordHashingMetrics:
+    return password_hasher.metrics()
@@ -10,6 +10,7 @@ from app.users.utils.confirmations import (
     ConfirmationTokenData,
     TokenVerificationResponses,
 )
+from app.users.utils.password_hashing import PasswordHashingAdmission
 from app.users.utils.users import UserResponses
 
 router = APIRouterExt(tags=["password reset"])
@@ -38,6 +39,7 @@ class ResetCredentials(ConfirmationTokenData):
 @router.post(
     "/confirmations/",
     responses=TokenVerificationResponses.responses(),
+    dependencies=[PasswordHashingAdmission],
     summary="Confirm password reset and set a new password",
     status_code=204,
 )
@@ -48,4 +50,4 @@ async def confirm_password_reset(reset_data: ResetCredentials) -> None:
     user = await User.find_first_by_kwargs(reset_token=token)
     if user is None:
         raise TokenVerificationResponses.INVALID_TOKEN
-    user.reset_password(password=reset_data.new_password)
+    await user.reset_password(password=reset_data.new_password)
@@ -1,59 +1,227 @@
-from contextlib import suppress
-from typing import Annotated
+import json
+from datetime import datetime
+from typing import Final
 
-from fastapi import Header, HTTPException
+from fastapi import HTTPException
 from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
 
-from app.common.fastapi_ext import APIRouterExt
+from app.common.config import autocommit_sessionmaker, sessionmaker, settings
+from app.common.cryptography import hash_token
+from app.common.sqlalchemy_ext import session_context
+from app.users.utils.access_tokens import (
+    add_access_token_to_response,
+    is_access_token_mode,
+    verify_access_token,
+)
 from app.users.utils.authorization import (
-    AuthCookie,
-    AuthHeader,
+    ACCESS_COOKIE_NAME,
+    AUTH_COOKIE_NAME,
+    AUTH_HEADER_NAME,
+    AuthorizedResponses,
     authorize_session,
     authorize_user,
 )
+from app.users.utils.session_cache import CachedSession, cache_session, session_cache
+
 
-router = APIRouterExt(tags=["proxy auth"])
+async def retrieve_proxy_session(token: str, response: Response) -> CachedSession:
+    token_digest = hash_token(token)
+    cached_session = session_cache.get(token_digest)
+    if cached_session is None or cached_session.is_renewal_required():
+        session = await authorize_session(cookie_token=token)
+        user = await authorize_user(session, response)
+        cached_session = CachedSession(
+            session_id=session.id,
+            user_id=user.id,
+            username=user.username,
+            cross_site=session.cross_site,
+            expiry=session.expiry,
+            renewal_deadline=session.renewal_deadline,
+        )
+        # previous tokens (accepted during the grace period) are not cached
+        if session.token_digest == token_digest:
+            cache_session(token_digest, cached_session)
+    return cached_session
 
 
-@router.get(
-    "/proxy/auth/",
-    status_code=204,
-    summary="Retrieve headers for proxy authorization, return 401 on invalid auth",
-)
-async def proxy_auth(
-    response: Response,
-    x_request_method: Annotated[str | None, Header(alias="X-Request-Method")] = None,
-    header_token: AuthHeader = None,
-    cookie_token: AuthCookie = None,
-) -> None:
-    if x_request_method and x_request_method.upper() == "OPTIONS":
-        return
-
-    session = await authorize_session(
-        header_token=header_token, cookie_token=cookie_token
-    )
-    user = await authorize_user(session, response)
-
-    response.headers["X-Session-ID"] = str(session.id)
-    response.headers["X-User-ID"] = str(user.id)
-    response.headers["X-Username"] = user.username
-
-
-@router.get(
-    "/proxy/optional-auth/",
-    status_code=204,
-    summary="Retrieve headers for proxy authorization, do nothing on invalid auth",
+NO_CACHE_HEADERS: Final[dict[str, str]] = {
+    "Cache-Control": "no-store",
+    "X-Accel-Expires": "0",
+}
+
+
+def proxy_cache_headers(
+    token: str, cached_session: CachedSession, is_cacheable: bool
+) -> dict[str, str]:
+    """
+    Caching hints for gateways, bounded by :py:attr:`proxy_auth_cache_max_age`
+    and the time left until the session requires renewal. Responses
+    which set cookies (renewal or access tokens) are never cacheable
+    """
+    max_age = 0
+    if is_cacheable:
+        max_age = min(
+            settings.proxy_auth_cache_max_age,
+            int((cached_session.renewal_deadline - datetime.utcnow()).total_seconds()),
+        )
+    if max_age <= 0:
+        return NO_CACHE_HEADERS
+    return {
+        "Cache-Control": f"private, max-age={max_age}",
+        "X-Accel-Expires": str(max_age),
+        "X-Auth-Cache-Key": hash_token(token).hex(),
+    }
+
+
+AUTH_HEADER_KEY: Final[bytes] = AUTH_HEADER_NAME.lower().encode("latin-1")
+REQUEST_METHOD_HEADER_KEY: Final[bytes] = b"x-request-method"
+AUTH_COOKIE_PREFIX: Final[str] = f"{AUTH_COOKIE_NAME}="
+ACCESS_COOKIE_PREFIX: Final[str] = f"{ACCESS_COOKIE_NAME}="
+JSON_CONTENT_TYPE_HEADER: Final[tuple[bytes, bytes]] = (
+    b"content-type",
+    b"application/json",
 )
-async def optional_proxy_auth(
-    response: Response,
-    x_request_method: Annotated[str | None, Header(alias="X-Request-Method")] = None,
-    header_token: AuthHeader = None,
-    cookie_token: AuthCookie = None,
-) -> None:
-    with suppress(HTTPException):
-        await proxy_auth(
-            response=response,
-            x_request_method=x_request_method,
-            header_token=header_token,
-            cookie_token=cookie_token,
+NO_STORE_HEADER: Final[tuple[bytes, bytes]] = (b"cache-control", b"no-store")
+
+
+def find_cookie(cookie_header: bytes, prefix: str) -> str | None:
+    for chunk in cookie_header.decode("latin-1").split(";"):
+        chunk = chunk.strip()
+        if chunk.startswith(prefix):
+            return chunk[len(prefix) :] or None
+    return None
+
+
+class ProxyAuthApp:
+    """
+    Proxy authorization as a lightweight ASGI app, skipping dependency resolution
+    and response object creation. Responds with 204 and identity headers,
+    or with 401 on invalid auth (nothing, if ``optional``). A database session
+    is only opened when the token is not in the :py:data:`session_cache`
+    """
+
+    def __init__(self, optional: bool) -> None:
+        self.optional = optional
+
+    async def send_empty(
+        self, send: Send, headers: list[tuple[bytes, bytes]] | None = None
+    ) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 204,
+                "headers": [] if headers is None else headers,
+            }
+        )
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send_identity(
+        self,
+        send: Send,
+        session_id: int,
+        user_id: int,
+        username: str,
+        headers: list[tuple[bytes, bytes]] | None = None,
+    ) -> None:
+        if headers is None:
+            headers = []
+        headers.append((b"x-session-id", str(session_id).encode("latin-1")))
+        headers.append((b"x-user-id", str(user_id).encode("latin-1")))
+        headers.append((b"x-username", username.encode("latin-1")))
+        await self.send_empty(send, headers)
+
+    async def send_error(self, send: Send, error: HTTPException) -> None:
+        if self.optional:
+            await self.send_empty(send, [NO_STORE_HEADER])
+            return
+        body = json.dumps({"detail": error.detail}).encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": error.status_code,
+                "headers": [
+                    JSON_CONTENT_TYPE_HEADER,
+                    NO_STORE_HEADER,
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    async def retrieve_session(
+        self, token: str, headers: list[tuple[bytes, bytes]]
+    ) -> CachedSession:
+        cached_session = session_cache.get(hash_token(token))
+        if cached_session is not None and not cached_session.is_renewal_required():
+            if not is_access_token_mode():
+                return cached_session
+            response = Response()
+        else:
+            response = Response()
+            db_sessionmaker = (
+                autocommit_sessionmaker
+                if settings.postgres_autocommit_reads
+                else sessionmaker
+            )
+            async with db_sessionmaker.begin() as db_session:
+                session_context.set(db_session)
+                cached_session = await retrieve_proxy_session(token, response)
+
+        add_access_token_to_response(response, cached_session)
+        headers.extend(
+            header for header in response.raw_headers if header[0] == b"set-cookie"
+        )
+        return cached_session
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        header_token: str | None = None
+        cookie_token: str | None = None
+        access_token: str | None = None
+        for key, value in scope["headers"]:
+            if key == b"cookie":
+                cookie_token = cookie_token or find_cookie(value, AUTH_COOKIE_PREFIX)
+                access_token = access_token or find_cookie(value, ACCESS_COOKIE_PREFIX)
+            elif key == AUTH_HEADER_KEY:
+                header_token = value.decode("latin-1")
+            elif key == REQUEST_METHOD_HEADER_KEY and value.upper() == b"OPTIONS":
+                await self.send_empty(send)
+                return
+
+        access_token_payload = verify_access_token(access_token)
+        if access_token_payload is not None:
+            await self.send_identity(
+                send,
+                session_id=access_token_payload.session_id,
+                user_id=access_token_payload.user_id,
+                username=access_token_payload.username,
+            )
+            return
+
+        token = cookie_token or header_token
+        if token is None:
+            await self.send_error(send, AuthorizedResponses.HEADER_MISSING.value)
+            return
+
+        headers: list[tuple[bytes, bytes]] = []
+        try:
+            cached_session = await self.retrieve_session(token, headers)
+        except HTTPException as error:
+            await self.send_error(send, error)
+            return
+
+        cache_headers = proxy_cache_headers(
+            token, cached_session, is_cacheable=len(headers) == 0
+        )
+        headers.extend(
+            (key.lower().encode("latin-1"), value.encode("latin-1"))
+            for key, value in cache_headers.items()
+        )
+
+        await self.send_identity(
+            send,
+            session_id=cached_session.session_id,
+            user_id=cached_session.user_id,
+            username=cached_session.username,
+            headers=headers,
         )
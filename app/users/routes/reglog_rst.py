@@ -1,5 +1,5 @@
 from aio_pika import Message
-from fastapi import Response
+from fastapi import BackgroundTasks, Response
 from starlette.status import HTTP_401_UNAUTHORIZED
 
 from app.common.config import email_confirmation_cryptography, pochta_producer
@@ -12,6 +12,7 @@ from app.users.utils.authorization import (
     add_session_to_response,
     remove_session_from_response,
 )
+from app.users.utils.password_hashing import PasswordHashingAdmission, rehash_password
 from app.users.utils.users import (
     UserConflictResponses,
     UserEmailResponses,
@@ -26,6 +27,7 @@ router = APIRouterExt(tags=["reglog"])
 @router.post(
     "/signup/",
     response_model=User.FullModel,
+    dependencies=[PasswordHashingAdmission],
     responses=UserConflictResponses.responses(),
     summary="Register a new account",
 )
@@ -37,7 +39,10 @@ async def signup(
     if not await is_username_unique(user_data.username):
         raise UsernameResponses.USERNAME_IN_USE.value
 
-    user = await User.create(**user_data.model_dump())
+    user = await User.create(
+        **user_data.model_dump(exclude={"password"}),
+        password=await User.generate_hash(user_data.password),
+    )
 
     confirmation_token: str = email_confirmation_cryptography.encrypt(user.email)
     await pochta_producer.send_message(
@@ -46,7 +51,7 @@ async def signup(
         ),
     )
 
-    session = await Session.create(user=user, cross_site=cross_site)
+    session = await Session.create(user_id=user.id, cross_site=cross_site)
     add_session_to_response(response, session)
 
     return user
@@ -60,20 +65,32 @@ class SigninResponses(Responses):
 @router.post(
     "/signin/",
     response_model=User.FullModel,
+    dependencies=[PasswordHashingAdmission],
     responses=SigninResponses.responses(),
     summary="Sign in into an existing account (creates a new session)",
 )
 async def signin(
-    user_data: User.CredentialsModel, cross_site: CrossSiteMode, response: Response
+    user_data: User.CredentialsModel,
+    cross_site: CrossSiteMode,
+    response: Response,
+    background_tasks: BackgroundTasks,
 ) -> User:
     user = await User.find_first_by_kwargs(email=user_data.email)
     if user is None:
         raise SigninResponses.USER_NOT_FOUND.value
 
-    if not user.is_password_valid(user_data.password):
+    if not await user.is_password_valid(user_data.password):
         raise SigninResponses.WRONG_PASSWORD.value
 
-    session = await Session.create(user=user, cross_site=cross_site)
+    if user.is_password_hash_outdated():
+        background_tasks.add_task(
+            rehash_password,
+            user_id=user.id,
+            password=user_data.password,
+            password_hash=user.password,
+        )
+
+    session = await Session.create(user_id=user.id, cross_site=cross_site)
     add_session_to_response(response, session)
     await Session.cleanup_by_user(user.id)
 
@@ -86,5 +103,5 @@ async def signin(
     summary="Sign out from current account (disables the current session and removes cookies)",
 )
 async def signout(session: AuthorizedSession, response: Response) -> None:
-    session.disabled = True
+    session.disable()
     remove_session_from_response(response)
@@ -0,0 +1,73 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+from starlette.status import HTTP_422_UNPROCESSABLE_ENTITY
+
+from app.common.config import sessionmaker
+from app.common.fastapi_ext import APIRouterExt, Responses
+from app.common.sqlalchemy_ext import session_context
+from app.users.models.sessions_db import Session
+
+router = APIRouterExt(tags=["sessions mub"])
+
+
+class SessionRevocationModel(BaseModel):
+    """
+    Sessions matching all of the set criteria are revoked,
+    revoking all sessions requires ``all_sessions`` to be set explicitly
+    """
+
+    created_before: datetime | None = None
+    cross_site: bool | None = None
+    mub: bool | None = None
+    all_sessions: bool = False
+    delete_sessions: bool = False
+
+
+class SessionRevocationResultModel(BaseModel):
+    sessions: int
+    users: int
+
+
+class SessionRevocationResponses(Responses):
+    NO_CRITERIA = (HTTP_422_UNPROCESSABLE_ENTITY, "No criteria set")
+
+
+@router.post(
+    "/",
+    response_model=SessionRevocationResultModel,
+    responses=SessionRevocationResponses.responses(),
+    summary="Disable or delete sessions of all users matching the criteria",
+)
+async def revoke_matching_sessions(
+    data: SessionRevocationModel,
+) -> SessionRevocationResultModel:
+    criteria = data.model_dump(exclude={"all_sessions", "delete_sessions"})
+    if not data.all_sessions and all(value is None for value in criteria.values()):
+        raise SessionRevocationResponses.NO_CRITERIA.value
+
+    batch_size = Session.revocation_batch_size
+    sessions_count = 0
+    user_ids: set[int] = set()
+    after_id = 0
+    while True:
+        # every batch is committed separately, so that locks are held shortly
+        async with sessionmaker.begin() as db_session:
+            token = session_context.set(db_session)
+            try:
+                rows = await Session.revoke_matching(
+                    batch_size=batch_size,
+                    after_id=after_id,
+                    delete_sessions=data.delete_sessions,
+                    **criteria,
+                )
+            finally:
+                session_context.reset(token)
+
+        sessions_count += len(rows)
+        user_ids.update(user_id for _, user_id in rows)
+        if len(rows) < batch_size:
+            return SessionRevocationResultModel(
+                sessions=sessions_count, users=len(user_ids)
+            )
+        after_id = max(session_id for session_id, _ in rows)
@@ -6,6 +6,7 @@ from starlette.status import HTTP_404_NOT_FOUND
 from app.common.fastapi_ext import APIRouterExt, Responses
 from app.users.models.sessions_db import Session
 from app.users.utils.authorization import AUTH_COOKIE_NAME, add_session_to_response
+from app.users.utils.session_pagination import SessionPagination
 from app.users.utils.users import TargetUser
 
 router = APIRouterExt(tags=["sessions mub"])
@@ -32,25 +33,19 @@ async def make_mub_session(response: Response, user: TargetUser) -> None:
     add_mub_session_to_response(response, session)
 
 
-@router.put(
-    "/",
-    status_code=204,
-    summary="Retrieve or create an admin session",
-)
-async def upsert_mub_session(response: Response, user: TargetUser) -> None:
-    session = await Session.find_active_mub_session(user.id)
-    if session is None:
-        session = await Session.create(user_id=user.id, mub=True)
-    add_mub_session_to_response(response, session)
-
-
 @router.get(
     "/",
     response_model=list[Session.MUBFullModel],
-    summary="List all user sessions",
+    summary="List user sessions (newest first)",
 )
-async def list_all_sessions(user: TargetUser) -> Sequence[Session]:
-    return await Session.find_all_by_kwargs(Session.expiry.desc(), user_id=user.id)
+async def list_all_sessions(
+    response: Response, user: TargetUser, page: SessionPagination
+) -> Sequence[Session]:
+    sessions = await Session.find_all_by_user(
+        user.id, after=page.after, limit=page.limit
+    )
+    page.add_next_cursor_to_response(response, sessions)
+    return sessions
 
 
 class SessionResponses(Responses):
@@ -74,4 +69,4 @@ async def disable_or_delete_session(
     if delete_session:
         await session.delete()
     else:
-        session.disabled = True
+        session.disable()
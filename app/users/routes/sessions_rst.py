@@ -1,10 +1,12 @@
 from collections.abc import Sequence
 
+from fastapi import Response
 from starlette.status import HTTP_404_NOT_FOUND
 
 from app.common.fastapi_ext import APIRouterExt, Responses
 from app.users.models.sessions_db import Session
 from app.users.utils.authorization import AuthorizedSession, AuthorizedUser
+from app.users.utils.session_pagination import SessionPagination
 
 router = APIRouterExt(tags=["user sessions"])
 
@@ -21,12 +23,19 @@ async def get_current_session(session: AuthorizedSession) -> Session:
 @router.get(
     "/",
     response_model=list[Session.FullModel],
-    summary="List all current user's sessions but the current one",
+    summary="List current user's sessions but the current one (newest first)",
 )
 async def list_sessions(
-    user: AuthorizedUser, session: AuthorizedSession
+    response: Response,
+    user: AuthorizedUser,
+    session: AuthorizedSession,
+    page: SessionPagination,
 ) -> Sequence[Session]:
-    return await Session.find_by_user(user.id, exclude_id=session.id)
+    sessions = await Session.find_by_user(
+        user.id, exclude_id=session.id, after=page.after, limit=page.limit
+    )
+    page.add_next_cursor_to_response(response, sessions)
+    return sessions
 
 
 @router.delete(
@@ -56,4 +65,4 @@ async def disable_session(session_id: int, user: AuthorizedUser) -> None:
     )
     if session is None:
         raise SessionResponses.SESSION_NOT_FOUND.value
-    session.disabled = True
+    session.disable()
@@ -1,5 +1,6 @@
 from app.common.fastapi_ext import APIRouterExt
 from app.users.models.users_db import User
+from app.users.utils.password_hashing import PasswordHashingAdmission
 from app.users.utils.users import (
     TargetUser,
     UserConflictResponses,
@@ -16,6 +17,7 @@ router = APIRouterExt(tags=["users mub"])
     "/",
     status_code=201,
     response_model=User.FullModel,
+    dependencies=[PasswordHashingAdmission],
     responses=UserConflictResponses.responses(),
     summary="Create a new user",
 )
@@ -24,7 +26,10 @@ async def create_user(user_data: User.InputModel) -> User:
         raise UserEmailResponses.EMAIL_IN_USE.value
     if not await is_username_unique(user_data.username):
         raise UsernameResponses.USERNAME_IN_USE.value
-    return await User.create(**user_data.model_dump())
+    return await User.create(
+        **user_data.model_dump(exclude={"password"}),
+        password=await User.generate_hash(user_data.password),
+    )
 
 
 @router.get(
@@ -39,6 +44,7 @@ async def retrieve_user(user: TargetUser) -> User:
 @router.patch(
     "/{user_id}/",
     response_model=User.FullModel,
+    dependencies=[PasswordHashingAdmission],
     responses=UserConflictResponses.responses(),
     summary="Update any user's data by id",
 )
@@ -47,7 +53,10 @@ async def update_user(user: TargetUser, user_data: User.FullPatchModel) -> User:
         raise UserEmailResponses.EMAIL_IN_USE.value
     if not await is_username_unique(user_data.username, user.username):
         raise UsernameResponses.USERNAME_IN_USE.value
-    user.update(**user_data.model_dump(exclude_defaults=True))
+    update_data = user_data.model_dump(exclude_defaults=True)
+    if "password" in update_data:
+        update_data["password"] = await User.generate_hash(update_data["password"])
+    user.update(**update_data)
     return user
 
 
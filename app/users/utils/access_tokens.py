@@ -0,0 +1,56 @@
+from dataclasses import dataclass
+
+from starlette.responses import Response
+
+from app.common.config import access_token_cryptography, settings
+from app.users.utils.authorization import ACCESS_COOKIE_NAME
+from app.users.utils.session_cache import CachedSession
+
+
+@dataclass(frozen=True, slots=True)
+class AccessTokenPayload:
+    session_id: int
+    user_id: int
+    username: str
+
+
+def is_access_token_mode() -> bool:
+    return access_token_cryptography is not None
+
+
+def verify_access_token(access_token: str | None) -> AccessTokenPayload | None:
+    """
+    Check the signature and lifetime of an access token without database lookups,
+    so session revocations only take effect once the token expires
+    """
+    if access_token_cryptography is None or access_token is None:
+        return None
+    data = access_token_cryptography.decrypt(access_token)
+    if data is None:
+        return None
+    session_id, user_id, username = data.split(":", maxsplit=2)
+    return AccessTokenPayload(
+        session_id=int(session_id),
+        user_id=int(user_id),
+        username=username,
+    )
+
+
+def add_access_token_to_response(
+    response: Response, cached_session: CachedSession
+) -> None:
+    if access_token_cryptography is None:
+        return
+    response.set_cookie(
+        ACCESS_COOKIE_NAME,
+        access_token_cryptography.encrypt(
+            # usernames can't contain colons
+            f"{cached_session.session_id}:{cached_session.user_id}"
+            f":{cached_session.username}"
+        ),
+        max_age=access_token_cryptography.encryption_ttl,
+        domain=settings.cookie_domain,
+        samesite="none" if cached_session.cross_site else "strict",
+        httponly=True,
+        secure=True,
+    )
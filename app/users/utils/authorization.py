@@ -7,12 +7,15 @@ from fastapi.security import APIKeyCookie, APIKeyHeader
 from starlette.status import HTTP_401_UNAUTHORIZED
 
 from app.common.config import settings
+from app.common.cryptography import hash_token
 from app.common.fastapi_ext import Responses, with_responses
 from app.users.models.sessions_db import Session
 from app.users.models.users_db import User
+from app.users.utils.session_cache import invalid_token_cache
 
 AUTH_HEADER_NAME: Final[str] = "X-XI-ID"
 AUTH_COOKIE_NAME: Final[str] = "xi_id_token"
+ACCESS_COOKIE_NAME: Final[str] = "xi_access_token"
 TEST_HEADER_NAME: Final[str] = "X-Testing"
 
 header_auth_scheme = APIKeyHeader(
@@ -36,10 +39,14 @@ def add_session_to_response(response: Response, session: Session) -> None:
         httponly=True,
         secure=True,
     )
+    # access tokens are checked before session tokens, one issued
+    # for another session (or user) must not outlive the switch
+    response.delete_cookie(ACCESS_COOKIE_NAME, domain=settings.cookie_domain)
 
 
 def remove_session_from_response(response: Response) -> None:
     response.delete_cookie(AUTH_COOKIE_NAME, domain=settings.cookie_domain)
+    response.delete_cookie(ACCESS_COOKIE_NAME, domain=settings.cookie_domain)
 
 
 class AuthorizedResponses(Responses):
@@ -56,10 +63,17 @@ async def authorize_session(
     if token is None:
         raise AuthorizedResponses.HEADER_MISSING.value
 
-    session = await Session.find_first_by_kwargs(token=token)
+    token_hash = hash_token(token)
+    if invalid_token_cache.get(token_hash) is not None:
+        raise AuthorizedResponses.INVALID_SESSION.value
+
+    session = await Session.find_first_by_token(token)
     if session is None or session.invalid:
+        invalid_token_cache.set(token_hash, True)
         raise AuthorizedResponses.INVALID_SESSION.value
 
+    # a previous token (replaced by a concurrent renewal) is accepted as is,
+    # the new one is only known to (and sent by) the request which renewed it
     return session
 
 
@@ -75,13 +89,21 @@ def is_cross_site_mode(
 CrossSiteMode = Annotated[bool, Depends(is_cross_site_mode)]
 
 
+# renewals in progress in the current process, used to coalesce concurrent ones
+renewing_session_ids: set[int] = set()
+
+
 async def authorize_user(
     session: AuthorizedSession,
     response: Response,
 ) -> User:
-    if session.is_renewal_required():
-        session.renew()
-        add_session_to_response(response, session)
+    if session.is_renewal_required() and session.id not in renewing_session_ids:
+        renewing_session_ids.add(session.id)
+        try:
+            if await session.renew():
+                add_session_to_response(response, session)
+        finally:
+            renewing_session_ids.discard(session.id)
 
     return await session.awaitable_attrs.user  # type: ignore[no-any-return]
 
@@ -0,0 +1,48 @@
+from collections.abc import AsyncIterator
+
+from fastapi import Depends
+from starlette.status import HTTP_429_TOO_MANY_REQUESTS
+
+from app.common.config import password_hasher, sessionmaker, settings
+from app.common.fastapi_ext import Responses, with_responses
+from app.common.password_hashing import PasswordHashingOverloadedError
+from app.common.sqlalchemy_ext import session_context
+from app.users.models.users_db import User
+
+
+class PasswordHashingResponses(Responses):
+    TOO_MANY_REQUESTS = (
+        HTTP_429_TOO_MANY_REQUESTS,
+        "Too many requests, try again later",
+        {"Retry-After": str(settings.password_hashing.retry_after)},
+    )
+
+
+@with_responses(PasswordHashingResponses)
+async def password_hashing_admission() -> AsyncIterator[None]:
+    try:
+        yield
+    except PasswordHashingOverloadedError:
+        raise PasswordHashingResponses.TOO_MANY_REQUESTS.value
+
+
+PasswordHashingAdmission = Depends(password_hashing_admission)
+
+
+async def rehash_password(user_id: int, password: str, password_hash: str) -> None:
+    """Upgrade an outdated hash, runs after the response is sent"""
+    try:
+        new_password_hash = await password_hasher.hash(password)
+    except PasswordHashingOverloadedError:
+        return  # the hash will be upgraded on one of the next signins
+
+    async with sessionmaker.begin() as db_session:
+        token = session_context.set(db_session)
+        try:
+            await User.replace_password_hash(
+                user_id=user_id,
+                password_hash=password_hash,
+                new_password_hash=new_password_hash,
+            )
+        finally:
+            session_context.reset(token)
@@ -0,0 +1,111 @@
+import asyncio
+import logging
+from collections.abc import Collection
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from app.common.aiopika_ext import RabbitFanoutConsumer
+from app.common.caching import TTLCache
+from app.common.config import sessions_producer, settings
+
+
+@dataclass(frozen=True, slots=True)
+class CachedSession:
+    session_id: int
+    user_id: int
+    username: str
+    cross_site: bool
+    expiry: datetime
+    renewal_deadline: datetime
+
+    def is_renewal_required(self) -> bool:
+        return self.renewal_deadline < datetime.utcnow()
+
+
+# keyed by token digests, same as sessions in the database
+session_cache: TTLCache[bytes, CachedSession] = TTLCache(
+    max_size=settings.session_cache.max_size,
+    ttl=settings.session_cache.ttl,
+)
+
+# keyed by token hashes, so that rejected tokens are not kept in memory as is
+invalid_token_cache: TTLCache[bytes, bool] = TTLCache(
+    max_size=settings.session_cache.invalid_max_size,
+    ttl=settings.session_cache.invalid_ttl,
+)
+
+
+def cache_session(token_digest: bytes, cached_session: CachedSession) -> None:
+    session_cache.set(
+        token_digest,
+        cached_session,
+        ttl=(cached_session.renewal_deadline - datetime.utcnow()).total_seconds(),
+    )
+
+
+def evict_session(session_id: int) -> None:
+    session_cache.evict_where(lambda cached: cached.session_id == session_id)
+
+
+def evict_sessions(session_ids: Collection[int]) -> None:
+    session_cache.evict_where(lambda cached: cached.session_id in session_ids)
+
+
+def evict_user_sessions(user_id: int, exclude_session_id: int | None = None) -> None:
+    session_cache.evict_where(
+        lambda cached: cached.user_id == user_id
+        and cached.session_id != exclude_session_id
+    )
+
+
+broadcasting_tasks: set[asyncio.Task[None]] = set()
+
+
+def broadcast_event(event_name: str, **data: Any) -> None:
+    if sessions_producer.is_uninitialized():
+        return
+    task = asyncio.get_running_loop().create_task(
+        sessions_producer.send_event(data, event_name=event_name)
+    )
+    broadcasting_tasks.add(task)
+    task.add_done_callback(broadcasting_tasks.discard)
+
+
+def revoke_session(event_name: str, token_digest: bytes, session_id: int) -> None:
+    """Evict a session locally and in other processes (by id, to not send digests)"""
+    session_cache.pop(token_digest)
+    broadcast_event(event_name, session_id=session_id)
+
+
+def revoke_sessions(event_name: str, session_ids: Collection[int]) -> None:
+    """Evict a batch of sessions locally and in other processes with a single event"""
+    evict_sessions(set(session_ids))
+    broadcast_event(event_name, session_ids=list(session_ids))
+
+
+def revoke_user_sessions(
+    event_name: str, user_id: int, exclude_session_id: int | None = None
+) -> None:
+    evict_user_sessions(user_id, exclude_session_id=exclude_session_id)
+    broadcast_event(event_name, user_id=user_id, exclude_session_id=exclude_session_id)
+
+
+async def handle_session_event(data: Any, event_name: str | None) -> None:
+    match event_name:
+        case "session-disabled" | "session-deleted":
+            evict_session(data["session_id"])
+        case "sessions-disabled" | "sessions-deleted":
+            evict_sessions(set(data["session_ids"]))
+        case "user-sessions-disabled" | "user-updated" | "user-deleted":
+            evict_user_sessions(
+                data["user_id"], exclude_session_id=data.get("exclude_session_id")
+            )
+        case _:
+            logging.warning(f"Unknown sessions event '{event_name}'")
+
+
+sessions_consumer = RabbitFanoutConsumer(
+    exchange=settings.mq_sessions_exchange,
+    handler=handle_session_event,
+)
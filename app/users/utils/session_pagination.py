@@ -0,0 +1,64 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Annotated, Final
+
+from fastapi import Depends, Query, Response
+from starlette.status import HTTP_422_UNPROCESSABLE_ENTITY
+
+from app.common.fastapi_ext import Responses, with_responses
+from app.users.models.sessions_db import Session
+
+NEXT_CURSOR_HEADER_NAME: Final[str] = "X-Next-Cursor"
+
+SessionCursor = tuple[datetime, int]
+
+
+def encode_session_cursor(session: Session) -> str:
+    data = f"{session.expiry.isoformat()}|{session.id}"
+    return urlsafe_b64encode(data.encode("utf-8")).decode("utf-8")
+
+
+def decode_session_cursor(cursor: str) -> SessionCursor | None:
+    try:
+        expiry, session_id = urlsafe_b64decode(cursor).decode("utf-8").split("|")
+        return datetime.fromisoformat(expiry), int(session_id)
+    except ValueError:  # includes base64 & unicode errors
+        return None
+
+
+class SessionPaginationResponses(Responses):
+    INVALID_CURSOR = (HTTP_422_UNPROCESSABLE_ENTITY, "Invalid cursor")
+
+
+@dataclass(frozen=True, slots=True)
+class SessionPage:
+    after: SessionCursor | None
+    limit: int | None
+
+    def add_next_cursor_to_response(
+        self, response: Response, sessions: Sequence[Session]
+    ) -> None:
+        """Full pages get a cursor to the next one (which can be empty)"""
+        if self.limit is not None and len(sessions) == self.limit:
+            response.headers[NEXT_CURSOR_HEADER_NAME] = encode_session_cursor(
+                sessions[-1]
+            )
+
+
+@with_responses(SessionPaginationResponses)
+async def session_pagination(
+    cursor: Annotated[str | None, Query(max_length=100)] = None,
+    limit: Annotated[int | None, Query(ge=1, le=1000)] = None,
+) -> SessionPage:
+    """Without a ``limit``, all sessions (after the ``cursor``) are returned"""
+    if cursor is None:
+        return SessionPage(after=None, limit=limit)
+    after = decode_session_cursor(cursor)
+    if after is None:
+        raise SessionPaginationResponses.INVALID_CURSOR.value
+    return SessionPage(after=after, limit=limit)
+
+
+SessionPagination = Annotated[SessionPage, Depends(session_pagination)]
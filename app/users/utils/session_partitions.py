@@ -0,0 +1,140 @@
+"""
+Sessions are stored in a table partitioned by ``expiry`` into periods
+of :py:attr:`Session.partition_period` (starting on mondays), named like
+``sessions_p20261012``, plus the ``sessions_default`` partition for everything
+outside of those. Partitions are created ahead of time and detached & dropped
+as a whole when all of their sessions expired more than
+:py:attr:`Session.max_history_timedelta` ago, instead of deleting expired sessions
+row by row
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Final
+
+from sqlalchemy import Table, text
+
+from app.common.sqlalchemy_ext import db
+from app.users.models.sessions_db import Session
+
+sessions_table: Table = Session.__table__  # type: ignore[assignment]
+PARTITION_PREFIX = f"{sessions_table.name}_p"
+DETACH_LOCK_TIMEOUT: Final[str] = "1s"
+
+
+def get_period_start(timestamp: datetime) -> date:
+    return (timestamp - timedelta(days=timestamp.weekday())).date()
+
+
+def get_partition_fullname(start: date) -> str:
+    name = f"{PARTITION_PREFIX}{start:%Y%m%d}"
+    if sessions_table.schema is None:
+        return name
+    return f"{sessions_table.schema}.{name}"
+
+
+async def list_session_partitions() -> list[date]:
+    """:return: starts of existing periodic partitions"""
+    names = await db.session.scalars(
+        text(
+            "SELECT partition.relname FROM pg_inherits "
+            "JOIN pg_class AS partition ON partition.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(:parent)"
+        ),
+        {"parent": sessions_table.fullname},
+    )
+    return sorted(
+        datetime.strptime(name.removeprefix(PARTITION_PREFIX), "%Y%m%d").date()
+        for name in names
+        if name.startswith(PARTITION_PREFIX)
+    )
+
+
+async def create_session_partition(start: date) -> None:
+    """
+    Create a partition as a standalone table, move matching rows from the default
+    partition into it (attaching fails if there are any), then attach it
+    """
+    fullname = get_partition_fullname(start)
+    bounds = {"start": start, "end": start + Session.partition_period}
+    await db.session.execute(
+        text(
+            f"CREATE TABLE {fullname} "
+            f"(LIKE {sessions_table.fullname} INCLUDING DEFAULTS)"
+        )
+    )
+    await db.session.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {sessions_table.fullname}_default "  # noqa: S608
+            "WHERE expiry >= :start AND expiry < :end RETURNING *) "
+            f"INSERT INTO {fullname} SELECT * FROM moved"
+        ),
+        bounds,
+    )
+    # DDL can't have bound parameters, values are dates, so it's safe to inline
+    await db.session.execute(
+        text(
+            f"ALTER TABLE {sessions_table.fullname} ATTACH PARTITION {fullname} "
+            f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+        )
+    )
+
+
+async def detach_session_partition(start: date) -> None:
+    """
+    Detaching locks the whole table: ``CONCURRENTLY`` isn't allowed while the
+    default partition exists. The lock is only waited for shortly, so that queries
+    on sessions don't queue up behind it, and is released on commit, so detaching
+    has to be committed on its own, before dropping the detached table
+    """
+    await db.session.execute(text(f"SET LOCAL lock_timeout = '{DETACH_LOCK_TIMEOUT}'"))
+    await db.session.execute(
+        text(
+            f"ALTER TABLE {sessions_table.fullname} "
+            f"DETACH PARTITION {get_partition_fullname(start)}"
+        )
+    )
+
+
+async def drop_session_partition(start: date) -> None:
+    await db.session.execute(text(f"DROP TABLE {get_partition_fullname(start)}"))
+
+
+async def maintain_session_partitions(
+    now: datetime | None = None,
+) -> tuple[list[date], list[date]]:
+    """
+    Create partitions for sessions which can be created or renewed until
+    the next maintenance, find partitions which only have sessions eligible
+    for deletion by :py:meth:`Session.cleanup`. Those are not dropped here,
+    see :py:func:`detach_session_partition` for the reason
+
+    :return: starts of created & expired partitions
+    """
+    if now is None:
+        now = datetime.utcnow()
+    # serializes maintenance between workers, released with the transaction
+    await db.session.execute(
+        text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+        {"key": sessions_table.fullname},
+    )
+    existing = await list_session_partitions()
+
+    created: list[date] = []
+    start = get_period_start(now)
+    last_start = get_period_start(
+        now + Session.expiry_timeout + Session.partition_period
+    )
+    while start <= last_start:
+        if start not in existing:
+            await create_session_partition(start)
+            created.append(start)
+        start += Session.partition_period
+
+    retention_limit = (now - Session.max_history_timedelta).date()
+    expired: list[date] = [
+        start
+        for start in existing
+        if start + Session.partition_period <= retention_limit
+    ]
+
+    return created, expired
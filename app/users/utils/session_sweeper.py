@@ -0,0 +1,111 @@
+import asyncio
+import logging
+from datetime import date
+from typing import Final
+
+from psycopg.errors import LockNotAvailable
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app.common.config import engine, sessionmaker
+from app.common.sqlalchemy_ext import session_context
+from app.users.models.sessions_db import Session
+from app.users.models.users_db import User
+from app.users.utils.session_partitions import (
+    detach_session_partition,
+    drop_session_partition,
+    maintain_session_partitions,
+)
+
+SWEEPER_LOCK_KEY: Final[str] = "session-sweeper"
+
+
+async def remove_session_partition(start: date) -> bool:
+    """
+    Detach & drop a partition in separate transactions, so that the lock
+    on the whole table is held only for detaching. If the lock can't be acquired
+    in time, the partition is left for the next sweep
+
+    :return: whether the partition was removed
+    """
+    try:
+        async with sessionmaker.begin() as db_session:
+            session_context.set(db_session)
+            await detach_session_partition(start)
+    except DBAPIError as error:
+        if isinstance(error.orig, LockNotAvailable):
+            return False
+        raise
+
+    async with sessionmaker.begin() as db_session:
+        session_context.set(db_session)
+        await drop_session_partition(start)
+    return True
+
+
+async def cleanup_sessions(batch_size: int) -> None:
+    async with sessionmaker.begin() as db_session:
+        session_context.set(db_session)
+        created, expired = await maintain_session_partitions()
+    dropped = [start for start in expired if await remove_session_partition(start)]
+    logging.info(
+        f"Session partitions: {len(created)} created, "
+        f"{len(dropped)} of {len(expired)} expired dropped"
+    )
+
+    # users are swept in batches by id, each in a separate transaction,
+    # so that limits are computed over a few users & locks are held shortly
+    disabled, deleted = 0, 0
+    after_user_id = 0
+    while True:
+        async with sessionmaker.begin() as db_session:
+            session_context.set(db_session)
+            user_ids = await User.find_ids_after(after_user_id, limit=batch_size)
+            if len(user_ids) == 0:
+                break
+            batch_disabled, batch_deleted = await Session.cleanup(user_ids=user_ids)
+        disabled += batch_disabled
+        deleted += batch_deleted
+        if len(user_ids) < batch_size:
+            break
+        after_user_id = user_ids[-1]
+    logging.info(f"Swept sessions: {disabled} disabled, {deleted} deleted")
+
+
+async def sweep_sessions(batch_size: int) -> bool:
+    """
+    Run :py:func:`cleanup_sessions` unless another worker is already doing it.
+    The advisory lock is session-level, so it is held across batch transactions
+    on a separate connection, which isn't left idle in a transaction meanwhile
+
+    :return: whether sessions were swept by this call
+    """
+    async with engine.connect() as connection:
+        locked = await connection.scalar(
+            text("SELECT pg_try_advisory_lock(hashtext(:key))"),
+            {"key": SWEEPER_LOCK_KEY},
+        )
+        await connection.commit()
+        if not locked:
+            logging.info("Sessions are being swept by another worker, skipping")
+            return False
+        try:
+            await cleanup_sessions(batch_size)
+        finally:
+            await connection.execute(
+                text("SELECT pg_advisory_unlock(hashtext(:key))"),
+                {"key": SWEEPER_LOCK_KEY},
+            )
+            await connection.commit()
+    return True
+
+
+async def run_session_sweeper(interval: int | None, batch_size: int) -> None:
+    if interval is None:
+        return
+    while True:  # noqa: WPS457  # cancelled on shutdown
+        await asyncio.sleep(interval)
+        try:
+            await sweep_sessions(batch_size)
+        except Exception:  # noqa: PIE786  # sweeping must go on after failures
+            logging.exception("Sessions sweeping failed")
@@ -0,0 +1,32 @@
+from types import TracebackType
+from typing import Any, Self
+
+from sqlalchemy import event
+
+from app.common.config import engine
+
+
+class QueryCounter:
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+        self.parameters: list[Any] = []
+
+    def record_statement(self, *args: Any) -> None:
+        self.statements.append(args[2])
+        self.parameters.append(args[3])
+
+    def __enter__(self) -> Self:
+        event.listen(engine.sync_engine, "before_cursor_execute", self.record_statement)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        event.remove(engine.sync_engine, "before_cursor_execute", self.record_statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
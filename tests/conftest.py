@@ -1,5 +1,6 @@
 from collections.abc import AsyncIterator, Iterator
 from typing import Any, BinaryIO
+from unittest.mock import patch
 
 import pytest
 from faker import Faker
@@ -37,7 +38,11 @@ async def _reset_database(active_session: ActiveSession) -> AsyncIterator[None]:
 
 @pytest.fixture(scope="session", autouse=True)
 def client() -> Iterator[TestClient]:
-    with TestClient(app, base_url=f"http://{settings.cookie_domain}") as client:
+    # the sweeper would interfere with sessions created by tests
+    with (
+        patch.object(settings.session_sweeper, "interval", None),
+        TestClient(app, base_url=f"http://{settings.cookie_domain}") as client,
+    ):
         yield client
 
 
@@ -9,10 +9,18 @@ from app.common.config import settings
 from app.users.models.sessions_db import Session
 from app.users.models.users_db import User
 from app.users.utils.authorization import AUTH_COOKIE_NAME, AUTH_HEADER_NAME
+from app.users.utils.session_cache import invalid_token_cache, session_cache
 from tests.common.active_session import ActiveSession
 from tests.common.types import Factory, PytestRequest
 
 
+@pytest.fixture(autouse=True)
+def _clear_session_cache() -> Iterator[None]:
+    yield
+    session_cache.clear()
+    invalid_token_cache.clear()
+
+
 @pytest.fixture()
 async def user_data(faker: Faker) -> dict[str, Any]:
     return {
@@ -29,7 +37,10 @@ async def user(
 ) -> User:
     async with active_session():
         return await User.create(
-            **{**user_data, "password": User.generate_hash(user_data["password"])},
+            **{
+                **user_data,
+                "password": await User.generate_hash(user_data["password"]),
+            },
         )
 
 
@@ -52,7 +63,7 @@ async def other_user(
         return await User.create(
             **{
                 **other_user_data,
-                "password": User.generate_hash(other_user_data["password"]),
+                "password": await User.generate_hash(other_user_data["password"]),
             },
         )
 
@@ -66,7 +77,7 @@ async def deleted_user(
         user = await User.create(
             username=faker.username(),
             email=faker.email(),
-            password=User.generate_hash(faker.password()),
+            password=await User.generate_hash(faker.password()),
         )
         await user.delete()
     return user
@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta
+from typing import Any
+from unittest.mock import AsyncMock
+
+import pytest
+from cryptography.fernet import Fernet
+from freezegun import freeze_time
+from starlette.testclient import TestClient
+
+from app.common.cryptography import CryptographyProvider
+from app.users.models.sessions_db import Session
+from app.users.models.users_db import User
+from app.users.utils.authorization import ACCESS_COOKIE_NAME
+from tests.common.assert_contains_ext import assert_nodata_response, assert_response
+from tests.common.mock_stack import MockStack
+
+ACCESS_TOKEN_TTL = 60
+
+
+@pytest.fixture()
+def access_token_cryptography(mock_stack: MockStack) -> CryptographyProvider:
+    cryptography = CryptographyProvider(
+        [Fernet.generate_key().decode()], encryption_ttl=ACCESS_TOKEN_TTL
+    )
+    mock_stack.enter_patch(
+        "app.users.utils.access_tokens.access_token_cryptography", new=cryptography
+    )
+    return cryptography
+
+
+@pytest.fixture()
+def access_token(
+    access_token_cryptography: CryptographyProvider, session: Session, user: User
+) -> str:
+    return access_token_cryptography.encrypt(f"{session.id}:{user.id}:{user.username}")
+
+
+@pytest.mark.anyio()
+@pytest.mark.usefixtures("access_token_cryptography")
+async def test_issuing_access_token(
+    authorized_client: TestClient,
+    session: Session,
+    user: User,
+) -> None:
+    assert_nodata_response(
+        authorized_client.get("/proxy/auth/"),
+        expected_cookies={ACCESS_COOKIE_NAME: str},
+        expected_headers={
+            "X-User-ID": str(user.id),
+            "X-Session-ID": str(session.id),
+        },
+    )
+
+
+@pytest.mark.anyio()
+async def test_not_issuing_access_token_when_disabled(
+    authorized_client: TestClient,
+) -> None:
+    assert_nodata_response(
+        authorized_client.get("/proxy/auth/"),
+        expected_cookies={ACCESS_COOKIE_NAME: None},
+        expected_headers={"X-User-ID": str},
+    )
+
+
+@pytest.mark.anyio()
+@pytest.mark.parametrize("path", ["/proxy/auth/", "/proxy/optional-auth/"])
+async def test_authorizing_with_access_token(
+    mock_stack: MockStack,
+    client: TestClient,
+    access_token: str,
+    session: Session,
+    user: User,
+    path: str,
+) -> None:
+    find_session_mock = mock_stack.enter_mock(
+        Session,
+        "find_first_by_token",
+        mock=AsyncMock(wraps=Session.find_first_by_token),
+    )
+
+    assert_nodata_response(
+        client.get(path, cookies={ACCESS_COOKIE_NAME: access_token}),
+        expected_headers={
+            "X-User-ID": str(user.id),
+            "X-Username": user.username,
+            "X-Session-ID": str(session.id),
+        },
+    )
+
+    find_session_mock.assert_not_called()
+
+
+@pytest.mark.anyio()
+async def test_authorizing_with_expired_access_token(
+    client: TestClient,
+    access_token: str,
+) -> None:
+    with freeze_time(datetime.utcnow() + timedelta(seconds=ACCESS_TOKEN_TTL * 2)):
+        response = client.get(
+            "/proxy/auth/", cookies={ACCESS_COOKIE_NAME: access_token}
+        )
+    assert_response(
+        response,
+        expected_code=401,
+        expected_json={"detail": "Authorization is missing"},
+    )
+
+
+@pytest.mark.anyio()
+async def test_signing_in_removes_access_token(
+    client: TestClient,
+    access_token: str,
+    other_user: User,
+    other_user_data: dict[str, Any],
+) -> None:
+    response = assert_response(
+        client.post(
+            "/api/signin/",
+            json=other_user_data,
+            cookies={ACCESS_COOKIE_NAME: access_token},
+        ),
+        expected_json={"id": other_user.id},
+    )
+
+    assert any(
+        cookie.startswith(f'{ACCESS_COOKIE_NAME}=""') and "Max-Age=0" in cookie
+        for cookie in response.headers.get_list("set-cookie")
+    )
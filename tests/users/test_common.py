@@ -1,7 +1,9 @@
+import pytest
 from faker import Faker
 from starlette.testclient import TestClient
 
 from tests.common.assert_contains_ext import assert_nodata_response, assert_response
+from tests.common.mock_stack import MockStack
 
 
 def test_redirecting_on_tailing_stash(client: TestClient) -> None:
@@ -40,3 +42,29 @@ def test_setting_cors_headers(faker: Faker, client: TestClient) -> None:
         },
         expected_json={},
     )
+
+
+@pytest.mark.parametrize(
+    ("method", "path"),
+    [
+        pytest.param("GET", "/docs", id="docs"),
+        pytest.param("GET", "/openapi.json", id="openapi"),
+        pytest.param("GET", "/static/favicon-for-light.svg", id="static"),
+        pytest.param("OPTIONS", "/api/signup/", id="preflight"),
+    ],
+)
+def test_skipping_database_session(
+    mock_stack: MockStack, client: TestClient, method: str, path: str
+) -> None:
+    session_context_mock = mock_stack.enter_mock(
+        "app.common.starlette_sqlalchemy_ext.session_context"
+    )
+
+    response = client.request(
+        method,
+        path,
+        headers={"Origin": "localhost", "Access-Control-Request-Method": "POST"},
+    )
+    assert response.status_code == 200
+
+    session_context_mock.set.assert_not_called()
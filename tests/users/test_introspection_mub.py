@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta
+from typing import Any
+
+import pytest
+from faker import Faker
+from freezegun import freeze_time
+from starlette.testclient import TestClient
+
+from app.users.models.sessions_db import Session
+from app.users.models.users_db import User
+from tests.common.active_session import ActiveSession
+from tests.common.assert_contains_ext import assert_response
+from tests.common.query_counter import QueryCounter
+
+
+@pytest.mark.anyio()
+async def test_introspecting_tokens(
+    faker: Faker,
+    mub_client: TestClient,
+    user: User,
+    session: Session,
+    invalid_session: Session,
+    other_user: User,
+    other_session: Session,
+) -> None:
+    tokens = [
+        session.token,
+        faker.pystr(),
+        other_session.token,
+        invalid_session.token,
+        session.token,
+    ]
+
+    with QueryCounter() as query_counter:
+        response = assert_response(
+            mub_client.post("/mub/sessions/introspection/", json={"tokens": tokens}),
+            expected_json=[
+                {
+                    "valid": True,
+                    "session_id": session.id,
+                    "user_id": user.id,
+                    "username": user.username,
+                },
+                {"valid": False, "session_id": None, "user_id": None},
+                {
+                    "valid": True,
+                    "session_id": other_session.id,
+                    "user_id": other_user.id,
+                    "username": other_user.username,
+                },
+                {"valid": False, "session_id": None, "user_id": None},
+                {"valid": True, "session_id": session.id},
+            ],
+        )
+    assert len(response.json()) == len(tokens)
+    assert query_counter.count == 1, query_counter.statements
+
+
+@pytest.mark.anyio()
+@pytest.mark.parametrize(
+    ("passed", "valid"),
+    [
+        pytest.param(timedelta(0), True, id="in_grace_period"),
+        pytest.param(Session.renewal_grace_period * 2, False, id="after_grace_period"),
+    ],
+)
+async def test_introspecting_previous_token(
+    active_session: ActiveSession,
+    mub_client: TestClient,
+    session: Session,
+    session_token: str,
+    passed: timedelta,
+    valid: bool,
+) -> None:
+    async with active_session():
+        assert await session.renew()
+
+    with freeze_time(datetime.utcnow() + passed):
+        response = mub_client.post(
+            "/mub/sessions/introspection/",
+            json={"tokens": [session_token, session.token]},
+        )
+    assert_response(
+        response,
+        expected_json=[
+            {"valid": valid, "session_id": session.id if valid else None},
+            {"valid": True, "session_id": session.id},
+        ],
+    )
+
+
+@pytest.mark.anyio()
+@pytest.mark.parametrize(
+    "tokens",
+    [pytest.param([], id="empty"), pytest.param(["token"] * 1001, id="too_many")],
+)
+async def test_introspecting_tokens_invalid_batch(
+    mub_client: TestClient, tokens: list[str]
+) -> None:
+    assert_response(
+        mub_client.post("/mub/sessions/introspection/", json={"tokens": tokens}),
+        expected_code=422,
+        expected_json={},
+    )
+
+
+@pytest.mark.anyio()
+async def test_introspecting_tokens_invalid_mub_key(
+    client: TestClient,
+    session_token: str,
+    invalid_mub_key_headers: dict[str, Any] | None,
+) -> None:
+    assert_response(
+        client.post(
+            "/mub/sessions/introspection/",
+            json={"tokens": [session_token]},
+            headers=invalid_mub_key_headers,
+        ),
+        expected_code=401,
+        expected_json={"detail": "Invalid key"},
+    )
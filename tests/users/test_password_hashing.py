@@ -0,0 +1,279 @@
+from dataclasses import dataclass
+from typing import Any
+from unittest.mock import AsyncMock
+
+import pytest
+from faker import Faker
+from starlette.testclient import TestClient
+
+from app.common.config import (
+    password_hasher,
+    password_reset_cryptography,
+    pochta_producer,
+)
+from app.common.password_hashing import (
+    PasswordHashingOverloadedError,
+    PasswordHashingPolicy,
+)
+from app.users.models.users_db import User
+from tests.common.active_session import ActiveSession
+from tests.common.assert_contains_ext import assert_nodata_response, assert_response
+from tests.common.mock_stack import MockStack
+from tests.utils import get_db_user
+
+
+@dataclass
+class HashingCounter:
+    hash_mock: AsyncMock
+    verify_mock: AsyncMock
+
+    def assert_counts(self, hashes: int, verifications: int) -> None:
+        assert self.hash_mock.await_count == hashes
+        assert self.verify_mock.await_count == verifications
+
+
+@pytest.fixture()
+def hashing_counter(mock_stack: MockStack) -> HashingCounter:
+    mock_stack.enter_async_mock(pochta_producer, "send_message")
+    return HashingCounter(
+        hash_mock=mock_stack.enter_mock(
+            password_hasher, "hash", mock=AsyncMock(wraps=password_hasher.hash)
+        ),
+        verify_mock=mock_stack.enter_mock(
+            password_hasher, "verify", mock=AsyncMock(wraps=password_hasher.verify)
+        ),
+    )
+
+
+@pytest.mark.anyio()
+async def test_signing_up_hashing_count(
+    faker: Faker,
+    active_session: ActiveSession,
+    client: TestClient,
+    hashing_counter: HashingCounter,
+) -> None:
+    response = assert_response(
+        client.post(
+            "/api/signup/",
+            json={
+                "username": faker.username(),
+                "email": faker.email(),
+                "password": faker.password(),
+            },
+        ),
+        expected_json={"id": int},
+    )
+    hashing_counter.assert_counts(hashes=1, verifications=0)
+
+    async with active_session():
+        user = await User.find_first_by_id(response.json()["id"])
+        assert user is not None
+        await user.delete()
+
+
+@pytest.mark.anyio()
+async def test_signing_up_conflict_hashing_count(
+    faker: Faker,
+    client: TestClient,
+    user: User,
+    hashing_counter: HashingCounter,
+) -> None:
+    assert_response(
+        client.post(
+            "/api/signup/",
+            json={
+                "username": user.username,
+                "email": faker.email(),
+                "password": faker.password(),
+            },
+        ),
+        expected_code=409,
+        expected_json={"detail": "Username already in use"},
+    )
+    hashing_counter.assert_counts(hashes=0, verifications=0)
+
+
+@pytest.mark.anyio()
+async def test_signing_in_hashing_count(
+    client: TestClient,
+    user_data: dict[str, Any],
+    user: User,
+    hashing_counter: HashingCounter,
+) -> None:
+    assert_response(
+        client.post("/api/signin/", json=user_data),
+        expected_json={"id": user.id},
+    )
+    hashing_counter.assert_counts(hashes=0, verifications=1)
+
+
+@pytest.mark.anyio()
+async def test_changing_user_password_hashing_count(
+    faker: Faker,
+    authorized_client: TestClient,
+    user_data: dict[str, Any],
+    hashing_counter: HashingCounter,
+) -> None:
+    assert_response(
+        authorized_client.put(
+            "/api/users/current/password/",
+            json={"password": user_data["password"], "new_password": faker.password()},
+        ),
+        expected_json={"username": user_data["username"]},
+    )
+    hashing_counter.assert_counts(hashes=1, verifications=1)
+
+
+@pytest.mark.anyio()
+async def test_changing_user_password_old_password_hashing_count(
+    authorized_client: TestClient,
+    user_data: dict[str, Any],
+    hashing_counter: HashingCounter,
+) -> None:
+    assert_response(
+        authorized_client.put(
+            "/api/users/current/password/",
+            json={
+                "password": user_data["password"],
+                "new_password": user_data["password"],
+            },
+        ),
+        expected_code=409,
+        expected_json={"detail": "New password matches the current one"},
+    )
+    hashing_counter.assert_counts(hashes=0, verifications=1)
+
+
+@pytest.mark.anyio()
+async def test_changing_user_email_hashing_count(
+    faker: Faker,
+    authorized_client: TestClient,
+    user_data: dict[str, Any],
+    hashing_counter: HashingCounter,
+) -> None:
+    assert_response(
+        authorized_client.put(
+            "/api/users/current/email/",
+            json={"password": user_data["password"], "new_email": faker.email()},
+        ),
+        expected_json={"username": user_data["username"]},
+    )
+    hashing_counter.assert_counts(hashes=0, verifications=1)
+
+
+@pytest.mark.anyio()
+async def test_changing_user_email_conflict_hashing_count(
+    authorized_client: TestClient,
+    user_data: dict[str, Any],
+    other_user: User,
+    hashing_counter: HashingCounter,
+) -> None:
+    assert_response(
+        authorized_client.put(
+            "/api/users/current/email/",
+            json={"password": user_data["password"], "new_email": other_user.email},
+        ),
+        expected_code=409,
+        expected_json={"detail": "Email already in use"},
+    )
+    hashing_counter.assert_counts(hashes=0, verifications=1)
+
+
+@pytest.mark.anyio()
+async def test_confirming_password_reset_hashing_count(
+    faker: Faker,
+    active_session: ActiveSession,
+    client: TestClient,
+    user: User,
+    hashing_counter: HashingCounter,
+) -> None:
+    async with active_session():
+        reset_token: str = (await get_db_user(user)).generated_reset_token
+
+    assert_nodata_response(
+        client.post(
+            "/api/password-reset/confirmations/",
+            json={
+                "token": password_reset_cryptography.encrypt(reset_token),
+                "new_password": faker.password(),
+            },
+        ),
+    )
+    hashing_counter.assert_counts(hashes=1, verifications=1)
+
+
+@pytest.mark.anyio()
+async def test_signin_password_hashing_overloaded(
+    mock_stack: MockStack,
+    client: TestClient,
+    user_data: dict[str, Any],
+    user: User,
+) -> None:
+    verify_mock = mock_stack.enter_async_mock(password_hasher, "verify")
+    verify_mock.side_effect = PasswordHashingOverloadedError
+
+    assert_response(
+        client.post("/api/signin/", json=user_data),
+        expected_code=429,
+        expected_json={"detail": "Too many requests, try again later"},
+        expected_headers={"Retry-After": "1"},
+    )
+
+
+@pytest.mark.anyio()
+async def test_retrieving_password_hashing_metrics(mub_client: TestClient) -> None:
+    assert_response(
+        mub_client.get("/mub/password-hashing/metrics/"),
+        expected_json={
+            "in_flight": int,
+            "queue_depth": int,
+            "admitted": int,
+            "rejected": int,
+            "wait_time_total": float,
+            "wait_time_max": float,
+        },
+    )
+
+
+@pytest.mark.anyio()
+async def test_retrieving_password_hashing_metrics_invalid_mub_key(
+    client: TestClient,
+    invalid_mub_key_headers: dict[str, Any] | None,
+) -> None:
+    assert_response(
+        client.get(
+            "/mub/password-hashing/metrics/",
+            headers=invalid_mub_key_headers,
+        ),
+        expected_code=401,
+        expected_json={"detail": "Invalid key"},
+    )
+
+
+@pytest.mark.anyio()
+@pytest.mark.parametrize(
+    "outdated", [False, True], ids=["up_to_date_hash", "outdated_hash"]
+)
+async def test_signing_in_password_rehashing(
+    mock_stack: MockStack,
+    active_session: ActiveSession,
+    client: TestClient,
+    user_data: dict[str, Any],
+    user: User,
+    outdated: bool,
+) -> None:
+    if outdated:
+        mock_stack.enter_patch(
+            password_hasher, "policy", new=PasswordHashingPolicy(rounds=1000)
+        )
+
+    assert_response(
+        client.post("/api/signin/", json=user_data),
+        expected_json={"id": user.id},
+    )
+
+    async with active_session():
+        db_user = await get_db_user(user)
+        assert (db_user.password != user.password) is outdated
+        assert not db_user.is_password_hash_outdated()
+        assert await db_user.is_password_valid(user_data["password"])
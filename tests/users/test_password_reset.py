@@ -70,7 +70,7 @@ async def test_confirming_password_reset(
 
     async with active_session():
         user_after_reset = await get_db_user(user)
-        assert user_after_reset.is_password_valid(new_password)
+        assert await user_after_reset.is_password_valid(new_password)
         assert user_after_reset.last_password_change > previous_last_password_change
         assert user_after_reset.reset_token is None
 
@@ -246,7 +246,7 @@ async def test_changing_user_password(
 
     async with active_session():
         user_after_password_changing = await get_db_user(user)
-        assert user_after_password_changing.is_password_valid(new_password)
+        assert await user_after_password_changing.is_password_valid(new_password)
         assert (
             user_after_password_changing.last_password_change
             > previous_last_password_change
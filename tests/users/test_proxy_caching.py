@@ -0,0 +1,78 @@
+from datetime import datetime
+
+import pytest
+from starlette.testclient import TestClient
+
+from app.common.config import settings
+from app.common.cryptography import hash_token
+from app.users.models.sessions_db import Session
+from tests.common.assert_contains_ext import assert_nodata_response, assert_response
+from tests.common.mock_stack import MockStack
+
+
+@pytest.mark.anyio()
+@pytest.mark.parametrize("path", ["/proxy/auth/", "/proxy/optional-auth/"])
+async def test_proxy_auth_not_cacheable_by_default(
+    authorized_client: TestClient,
+    path: str,
+) -> None:
+    response = authorized_client.get(path)
+    assert_nodata_response(
+        response,
+        expected_headers={"Cache-Control": "no-store", "X-Accel-Expires": "0"},
+    )
+    assert "X-Auth-Cache-Key" not in response.headers
+
+
+@pytest.mark.anyio()
+@pytest.mark.parametrize("path", ["/proxy/auth/", "/proxy/optional-auth/"])
+async def test_proxy_auth_cacheable(
+    mock_stack: MockStack,
+    authorized_client: TestClient,
+    session: Session,
+    path: str,
+) -> None:
+    mock_stack.enter_patch(settings, "proxy_auth_cache_max_age", new=30)
+
+    assert_nodata_response(
+        authorized_client.get(path),
+        expected_headers={
+            "Cache-Control": "private, max-age=30",
+            "X-Accel-Expires": "30",
+            "X-Auth-Cache-Key": hash_token(session.token).hex(),
+        },
+    )
+
+
+@pytest.mark.anyio()
+async def test_proxy_auth_cacheable_until_renewal(
+    mock_stack: MockStack,
+    authorized_client: TestClient,
+    session: Session,
+) -> None:
+    mock_stack.enter_patch(settings, "proxy_auth_cache_max_age", new=10**9)
+
+    response = authorized_client.get("/proxy/auth/")
+    assert_nodata_response(response)
+    max_age = int(response.headers["X-Accel-Expires"])
+    renewal_delay = session.renewal_deadline - datetime.utcnow()
+    assert 0 < max_age <= renewal_delay.total_seconds()
+    assert response.headers["Cache-Control"] == f"private, max-age={max_age}"
+
+
+@pytest.mark.anyio()
+async def test_proxy_auth_errors_not_cacheable(client: TestClient) -> None:
+    assert_response(
+        client.get("/proxy/auth/"),
+        expected_code=401,
+        expected_json={"detail": "Authorization is missing"},
+        expected_headers={"Cache-Control": "no-store"},
+    )
+
+
+@pytest.mark.anyio()
+async def test_optional_proxy_auth_errors_not_cacheable(client: TestClient) -> None:
+    assert_nodata_response(
+        client.get("/proxy/optional-auth/"),
+        expected_headers={"Cache-Control": "no-store"},
+    )
@@ -0,0 +1,207 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from starlette.testclient import TestClient
+
+from app.users.models.sessions_db import Session
+from app.users.models.users_db import User
+from app.users.utils.authorization import AUTH_HEADER_NAME
+from tests.common.active_session import ActiveSession
+from tests.common.assert_contains_ext import assert_nodata_response, assert_response
+from tests.common.mock_stack import MockStack
+from tests.common.types import Factory
+from tests.utils import get_db_session
+
+
+def assert_proxy_authorized(client: TestClient, session: Session, user: User) -> None:
+    assert_nodata_response(
+        client.get("/proxy/auth/"),
+        expected_headers={
+            "X-User-ID": str(user.id),
+            "X-Username": user.username,
+            "X-Session-ID": str(session.id),
+        },
+    )
+
+
+def assert_proxy_unauthorized(client: TestClient) -> None:
+    assert_response(
+        client.get("/proxy/auth/"),
+        expected_code=401,
+        expected_json={"detail": "Session is invalid"},
+    )
+
+
+@pytest.mark.anyio()
+async def test_proxy_auth_cached(
+    mock_stack: MockStack,
+    authorized_client: TestClient,
+    session: Session,
+    user: User,
+) -> None:
+    find_session_mock = mock_stack.enter_mock(
+        Session,
+        "find_first_by_token",
+        mock=AsyncMock(wraps=Session.find_first_by_token),
+    )
+
+    assert_proxy_authorized(authorized_client, session, user)
+    assert_proxy_authorized(authorized_client, session, user)
+
+    find_session_mock.assert_called_once()
+
+
+@pytest.mark.anyio()
+@pytest.mark.parametrize("path", ["/proxy/auth/", "/proxy/optional-auth/"])
+async def test_proxy_auth_cache_hit_without_database(
+    mock_stack: MockStack,
+    authorized_client: TestClient,
+    session: Session,
+    user: User,
+    path: str,
+) -> None:
+    assert_proxy_authorized(authorized_client, session, user)
+
+    sessionmaker_mock = mock_stack.enter_mock("app.users.routes.proxy_rst.sessionmaker")
+    autocommit_sessionmaker_mock = mock_stack.enter_mock(
+        "app.users.routes.proxy_rst.autocommit_sessionmaker"
+    )
+
+    assert_nodata_response(
+        authorized_client.get(path),
+        expected_headers={
+            "X-User-ID": str(user.id),
+            "X-Username": user.username,
+            "X-Session-ID": str(session.id),
+        },
+    )
+
+    sessionmaker_mock.begin.assert_not_called()
+    autocommit_sessionmaker_mock.begin.assert_not_called()
+
+
+@pytest.mark.anyio()
+async def test_proxy_auth_cache_evicted_on_signout(
+    authorized_client: TestClient,
+    session: Session,
+    user: User,
+) -> None:
+    assert_proxy_authorized(authorized_client, session, user)
+    assert_nodata_response(authorized_client.post("/api/signout/"))
+    assert_proxy_unauthorized(authorized_client)
+
+
+@pytest.mark.anyio()
+async def test_proxy_auth_cache_evicted_on_session_disabling(
+    authorized_client: TestClient,
+    session: Session,
+    user: User,
+) -> None:
+    assert_proxy_authorized(authorized_client, session, user)
+    assert_nodata_response(authorized_client.delete(f"/api/sessions/{session.id}/"))
+    assert_proxy_unauthorized(authorized_client)
+
+
+@pytest.mark.anyio()
+async def test_proxy_auth_cache_evicted_on_disabling_all_other(
+    client: TestClient,
+    authorized_client: TestClient,
+    session_factory: Factory[Session],
+    session: Session,
+    user: User,
+) -> None:
+    other_session = await session_factory()
+    other_headers = {AUTH_HEADER_NAME: other_session.token}
+
+    assert_nodata_response(
+        client.get("/proxy/auth/", headers=other_headers),
+        expected_headers={"X-Session-ID": str(other_session.id)},
+    )
+    assert_nodata_response(authorized_client.delete("/api/sessions/"))
+    assert_response(
+        client.get("/proxy/auth/", headers=other_headers),
+        expected_code=401,
+        expected_json={"detail": "Session is invalid"},
+    )
+    assert_proxy_authorized(authorized_client, session, user)
+
+
+@pytest.mark.anyio()
+@pytest.mark.parametrize(
+    "delete_session", [False, True], ids=["mub_disable", "mub_delete"]
+)
+async def test_proxy_auth_cache_evicted_on_mub_session_removal(
+    mub_client: TestClient,
+    authorized_client: TestClient,
+    session: Session,
+    user: User,
+    delete_session: bool,
+) -> None:
+    assert_proxy_authorized(authorized_client, session, user)
+    assert_nodata_response(
+        mub_client.delete(
+            f"/mub/users/{user.id}/sessions/{session.id}/",
+            params={"delete_session": delete_session},
+        )
+    )
+    assert_proxy_unauthorized(authorized_client)
+
+
+@pytest.mark.anyio()
+async def test_proxy_auth_cache_evicted_on_user_deletion(
+    mub_client: TestClient,
+    authorized_client: TestClient,
+    session: Session,
+    user: User,
+) -> None:
+    assert_proxy_authorized(authorized_client, session, user)
+    assert_nodata_response(mub_client.delete(f"/mub/users/{user.id}/"))
+    assert_proxy_unauthorized(authorized_client)
+
+
+@pytest.mark.anyio()
+@pytest.mark.parametrize(
+    "path", ["/proxy/auth/", "/api/users/current/home/"], ids=["proxy", "home"]
+)
+async def test_invalid_token_cached(
+    mock_stack: MockStack,
+    client: TestClient,
+    invalid_token: str,
+    path: str,
+) -> None:
+    find_session_mock = mock_stack.enter_mock(
+        Session,
+        "find_first_by_token",
+        mock=AsyncMock(wraps=Session.find_first_by_token),
+    )
+
+    for _ in range(2):
+        assert_response(
+            client.get(path, headers={AUTH_HEADER_NAME: invalid_token}),
+            expected_code=401,
+            expected_json={"detail": "Session is invalid"},
+        )
+
+    find_session_mock.assert_called_once()
+
+
+@pytest.mark.anyio()
+async def test_proxy_auth_previous_token_not_cached(
+    mock_stack: MockStack,
+    active_session: ActiveSession,
+    authorized_client: TestClient,
+    session: Session,
+    user: User,
+) -> None:
+    async with active_session():
+        assert await (await get_db_session(session)).renew()
+    find_session_mock = mock_stack.enter_mock(
+        Session,
+        "find_first_by_token",
+        mock=AsyncMock(wraps=Session.find_first_by_token),
+    )
+
+    assert_proxy_authorized(authorized_client, session, user)
+    assert_proxy_authorized(authorized_client, session, user)
+
+    assert find_session_mock.call_count == 2
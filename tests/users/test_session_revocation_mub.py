@@ -0,0 +1,206 @@
+from datetime import datetime, timedelta
+from typing import Any
+
+import pytest
+from starlette.testclient import TestClient
+
+from app.common.config import sessions_producer
+from app.users.models.sessions_db import Session
+from app.users.models.users_db import User
+from tests.common.active_session import ActiveSession
+from tests.common.assert_contains_ext import assert_response
+from tests.common.mock_stack import MockStack
+from tests.common.types import Factory
+from tests.users.test_session_cache import (
+    assert_proxy_authorized,
+    assert_proxy_unauthorized,
+)
+from tests.utils import get_db_session
+
+OLD_CREATED = datetime.utcnow() - timedelta(days=3)
+CREATED_BEFORE = datetime.utcnow() - timedelta(days=1)
+
+
+@pytest.fixture()
+async def sessions_by_kind(session_factory: Factory[Session]) -> dict[str, Session]:
+    return {
+        "plain": await session_factory(),
+        "old": await session_factory(created=OLD_CREATED),
+        "cross_site": await session_factory(cross_site=True),
+        "mub": await session_factory(mub=True),
+    }
+
+
+@pytest.mark.anyio()
+@pytest.mark.parametrize(
+    ("criteria", "revoked_kinds"),
+    [
+        pytest.param(
+            {"all_sessions": True}, {"plain", "old", "cross_site", "mub"}, id="all"
+        ),
+        pytest.param(
+            {"created_before": CREATED_BEFORE.isoformat()},
+            {"old"},
+            id="created_before",
+        ),
+        pytest.param({"cross_site": True}, {"cross_site"}, id="cross_site"),
+        pytest.param({"mub": False}, {"plain", "old", "cross_site"}, id="not_mub"),
+        pytest.param({"mub": True, "cross_site": False}, {"mub"}, id="combined"),
+    ],
+)
+async def test_revoking_matching_sessions(
+    active_session: ActiveSession,
+    mub_client: TestClient,
+    sessions_by_kind: dict[str, Session],
+    criteria: dict[str, Any],
+    revoked_kinds: set[str],
+) -> None:
+    assert_response(
+        mub_client.post("/mub/sessions/revocation/", json=criteria),
+        expected_json={"sessions": len(revoked_kinds), "users": 1},
+    )
+
+    async with active_session():
+        for kind, session in sessions_by_kind.items():
+            db_session = await get_db_session(session)
+            assert db_session.disabled is (kind in revoked_kinds), kind
+
+
+@pytest.mark.anyio()
+@pytest.mark.parametrize(
+    "data",
+    [
+        pytest.param({}, id="empty"),
+        pytest.param({"delete_sessions": True}, id="delete_only"),
+        pytest.param({"all_sessions": False, "mub": None}, id="explicit_nones"),
+    ],
+)
+async def test_revoking_without_criteria(
+    active_session: ActiveSession,
+    mub_client: TestClient,
+    session: Session,
+    data: dict[str, Any],
+) -> None:
+    assert_response(
+        mub_client.post("/mub/sessions/revocation/", json=data),
+        expected_code=422,
+        expected_json={"detail": "No criteria set"},
+    )
+
+    async with active_session():
+        assert not (await get_db_session(session)).invalid
+
+
+@pytest.mark.anyio()
+async def test_revoking_skips_disabled_sessions(
+    mub_client: TestClient,
+    session_factory: Factory[Session],
+) -> None:
+    await session_factory(disabled=True)
+    await session_factory()
+
+    assert_response(
+        mub_client.post("/mub/sessions/revocation/", json={"all_sessions": True}),
+        expected_json={"sessions": 1, "users": 1},
+    )
+
+
+@pytest.mark.anyio()
+async def test_deleting_matching_sessions(
+    active_session: ActiveSession,
+    mub_client: TestClient,
+    sessions_by_kind: dict[str, Session],
+) -> None:
+    assert_response(
+        mub_client.post(
+            "/mub/sessions/revocation/",
+            json={"cross_site": False, "delete_sessions": True},
+        ),
+        expected_json={"sessions": 3, "users": 1},
+    )
+
+    async with active_session():
+        for kind, session in sessions_by_kind.items():
+            db_session = await Session.find_first_by_id(session.id)
+            assert (db_session is None) is (kind != "cross_site"), kind
+
+
+@pytest.mark.anyio()
+@pytest.mark.parametrize("batch_size", [1, 2, 10])
+async def test_revoking_in_batches(
+    active_session: ActiveSession,
+    mock_stack: MockStack,
+    mub_client: TestClient,
+    session_factory: Factory[Session],
+    other_session: Session,
+    batch_size: int,
+) -> None:
+    mock_stack.enter_mock(Session, "revocation_batch_size", property_value=batch_size)
+    sessions = [await session_factory() for _ in range(4)]
+
+    assert_response(
+        mub_client.post("/mub/sessions/revocation/", json={"all_sessions": True}),
+        expected_json={"sessions": len(sessions) + 1, "users": 2},
+    )
+
+    async with active_session():
+        for session in [*sessions, other_session]:
+            assert (await get_db_session(session)).disabled
+
+
+@pytest.mark.anyio()
+async def test_revoking_broadcasts_once_per_batch(
+    mock_stack: MockStack,
+    mub_client: TestClient,
+    session_factory: Factory[Session],
+    other_session: Session,
+) -> None:
+    mock_stack.enter_mock(Session, "revocation_batch_size", property_value=2)
+    sessions = [*[await session_factory() for _ in range(2)], other_session]
+    send_event_mock = mock_stack.enter_async_mock(sessions_producer, "send_event")
+
+    assert_response(
+        mub_client.post("/mub/sessions/revocation/", json={"all_sessions": True}),
+        expected_json={"sessions": 3, "users": 2},
+    )
+
+    assert send_event_mock.call_count == 2
+    assert sorted(
+        session_id
+        for call in send_event_mock.call_args_list
+        for session_id in call.args[0]["session_ids"]
+    ) == sorted(session.id for session in sessions)
+
+
+@pytest.mark.anyio()
+async def test_revoking_evicts_cached_sessions(
+    authorized_client: TestClient,
+    mub_client: TestClient,
+    session: Session,
+    user: User,
+) -> None:
+    assert_proxy_authorized(authorized_client, session, user)
+
+    assert_response(
+        mub_client.post("/mub/sessions/revocation/", json={"all_sessions": True}),
+        expected_json={"sessions": 1, "users": 1},
+    )
+
+    assert_proxy_unauthorized(authorized_client)
+
+
+@pytest.mark.anyio()
+async def test_revoking_sessions_invalid_mub_key(
+    client: TestClient,
+    session: Session,
+    invalid_mub_key_headers: dict[str, Any] | None,
+) -> None:
+    assert_response(
+        client.post(
+            "/mub/sessions/revocation/",
+            json={"all_sessions": True},
+            headers=invalid_mub_key_headers,
+        ),
+        expected_code=401,
+        expected_json={"detail": "Invalid key"},
+    )
@@ -5,6 +5,7 @@ from starlette.testclient import TestClient
 from app.users.models.sessions_db import Session
 from app.users.models.users_db import User
 from app.users.utils.authorization import AUTH_COOKIE_NAME
+from app.users.utils.session_pagination import NEXT_CURSOR_HEADER_NAME
 from tests.common.active_session import ActiveSession
 from tests.common.assert_contains_ext import assert_nodata_response, assert_response
 from tests.common.types import Factory
@@ -96,6 +97,52 @@ async def test_listing_sessions(
     )
 
 
+@pytest.mark.anyio()
+async def test_listing_sessions_paginated(
+    authorized_client: TestClient,
+    session_factory: Factory[Session],
+) -> None:
+    sessions = [await session_factory() for _ in range(5)][::-1]
+
+    pages: list[list[int]] = []
+    params: dict[str, str | int] = {"limit": 2}
+    while True:
+        response = assert_response(
+            authorized_client.get("/api/sessions/", params=params),
+            expected_json=list,
+        )
+        pages.append([session["id"] for session in response.json()])
+        cursor = response.headers.get(NEXT_CURSOR_HEADER_NAME)
+        if cursor is None:
+            break
+        params["cursor"] = cursor
+
+    assert pages == [
+        [session.id for session in sessions[:2]],
+        [session.id for session in sessions[2:4]],
+        [sessions[4].id],
+    ]
+
+
+@pytest.mark.anyio()
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        pytest.param("not base64!", id="not_base64"),
+        pytest.param("aW52YWxpZA==", id="invalid_content"),
+    ],
+)
+async def test_listing_sessions_invalid_cursor(
+    authorized_client: TestClient,
+    cursor: str,
+) -> None:
+    assert_response(
+        authorized_client.get("/api/sessions/", params={"cursor": cursor}),
+        expected_code=422,
+        expected_json={"detail": "Invalid cursor"},
+    )
+
+
 @pytest.mark.anyio()
 async def test_disabling_all_other_sessions(
     active_session: ActiveSession,
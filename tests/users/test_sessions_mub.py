@@ -1,13 +1,14 @@
-from datetime import datetime
 from typing import Any
 
 import pytest
 from pydantic_marshals.contains import assert_contains
 from starlette.testclient import TestClient
 
+from app.common.cryptography import hash_token
 from app.users.models.sessions_db import Session
 from app.users.models.users_db import User
 from app.users.utils.authorization import AUTH_COOKIE_NAME
+from app.users.utils.session_pagination import NEXT_CURSOR_HEADER_NAME
 from tests.common.active_session import ActiveSession
 from tests.common.assert_contains_ext import assert_nodata_response, assert_response
 from tests.common.types import Factory
@@ -47,125 +48,28 @@ async def test_making_mub_session(
                 "user_id": session.user_id,
                 "invalid": session.invalid,
                 "id": session.id,
-                "token": session.token,
+                "token_digest": session.token_digest,
             },
             {
                 "mub": True,
                 "user_id": user.id,
                 "invalid": False,
                 "id": int(response.headers["X-Session-ID"]),
-                "token": response.headers["X-Session-Token"],
+                "token_digest": hash_token(response.headers["X-Session-Token"]),
             },
         )
 
 
 @pytest.mark.anyio()
-async def test_upserting_mub_session(
+async def test_making_mub_session_existing_kept(
     active_session: ActiveSession,
     mub_client: TestClient,
     user: User,
-) -> None:
-    response = assert_nodata_response(
-        mub_client.put(f"/mub/users/{user.id}/sessions/"),
-        expected_cookies={AUTH_COOKIE_NAME: str},
-        expected_headers={
-            "X-Session-ID": int,
-            "X-User-ID": str(user.id),
-            "X-Username": user.username,
-            "X-Session-Cookie": AUTH_COOKIE_NAME,
-            "X-Session-Token": str,
-        },
-    )
-
-    async with active_session():
-        session = await assert_session_from_cookie(response)
-        assert_contains(
-            {
-                "mub": session.mub,
-                "user_id": session.user_id,
-                "invalid": session.invalid,
-                "id": session.id,
-                "token": session.token,
-            },
-            {
-                "mub": True,
-                "user_id": user.id,
-                "invalid": False,
-                "id": int(response.headers["X-Session-ID"]),
-                "token": response.headers["X-Session-Token"],
-            },
-        )
-
-
-@pytest.mark.anyio()
-async def test_upserting_existing_mub_session(
-    mub_client: TestClient,
-    user: User,
     mub_session: Session,
 ) -> None:
-    assert_nodata_response(
-        mub_client.put(f"/mub/users/{user.id}/sessions/"),
-        expected_cookies={AUTH_COOKIE_NAME: mub_session.token},
-        expected_headers={
-            "X-Session-ID": str(mub_session.id),
-            "X-User-ID": str(user.id),
-            "X-Username": user.username,
-            "X-Session-Cookie": AUTH_COOKIE_NAME,
-            "X-Session-Token": mub_session.token,
-        },
-    )
-
-
-@pytest.mark.anyio()
-async def test_upserting_expired_mub_session(
-    active_session: ActiveSession,
-    session_factory: Factory[Session],
-    mub_client: TestClient,
-    user: User,
-) -> None:
-    await session_factory(mub=True, expiry=datetime.fromtimestamp(0))
     response = assert_nodata_response(
-        mub_client.put(f"/mub/users/{user.id}/sessions/"),
-        expected_cookies={AUTH_COOKIE_NAME: str},
-        expected_headers={
-            "X-Session-ID": int,
-            "X-User-ID": str(user.id),
-            "X-Username": user.username,
-            "X-Session-Cookie": AUTH_COOKIE_NAME,
-            "X-Session-Token": str,
-        },
-    )
-
-    async with active_session():
-        session = await assert_session_from_cookie(response)
-        assert_contains(
-            {
-                "mub": session.mub,
-                "user_id": session.user_id,
-                "invalid": session.invalid,
-                "id": session.id,
-                "token": session.token,
-            },
-            {
-                "mub": True,
-                "user_id": user.id,
-                "invalid": False,
-                "id": int(response.headers["X-Session-ID"]),
-                "token": response.headers["X-Session-Token"],
-            },
-        )
-
-
-@pytest.mark.anyio()
-async def test_upserting_disabled_mub_session(
-    active_session: ActiveSession,
-    session_factory: Factory[Session],
-    mub_client: TestClient,
-    user: User,
-) -> None:
-    await session_factory(mub=True, disabled=True)
-    response = assert_nodata_response(
-        mub_client.put(f"/mub/users/{user.id}/sessions/"),
+        mub_client.post(f"/mub/users/{user.id}/sessions/"),
+        expected_code=201,
         expected_cookies={AUTH_COOKIE_NAME: str},
         expected_headers={
             "X-Session-ID": int,
@@ -175,25 +79,14 @@ async def test_upserting_disabled_mub_session(
             "X-Session-Token": str,
         },
     )
+    assert int(response.headers["X-Session-ID"]) != mub_session.id
 
     async with active_session():
         session = await assert_session_from_cookie(response)
-        assert_contains(
-            {
-                "mub": session.mub,
-                "user_id": session.user_id,
-                "invalid": session.invalid,
-                "id": session.id,
-                "token": session.token,
-            },
-            {
-                "mub": True,
-                "user_id": user.id,
-                "invalid": False,
-                "id": int(response.headers["X-Session-ID"]),
-                "token": response.headers["X-Session-Token"],
-            },
-        )
+        assert session.mub
+        existing_session = await get_db_session(mub_session)
+        assert existing_session.token_digest == mub_session.token_digest
+        assert not existing_session.invalid
 
 
 @pytest.mark.anyio()
@@ -246,7 +139,7 @@ async def test_authorized_method_with_mub_session(
     )
 
 
-@pytest.mark.parametrize("method", ["POST", "PUT", "GET"])
+@pytest.mark.parametrize("method", ["POST", "GET"])
 @pytest.mark.anyio()
 async def test_retrieving_mub_session_user_not_found(
     mub_client: TestClient,
@@ -356,7 +249,30 @@ async def test_mub_getting_all_sessions(
     )
 
 
-@pytest.mark.parametrize("method", ["POST", "PUT", "GET"])
+@pytest.mark.anyio()
+async def test_mub_getting_sessions_paginated(
+    mub_client: TestClient,
+    user: User,
+    mub_sessions: list[Session],
+) -> None:
+    response = assert_response(
+        mub_client.get(f"/mub/users/{user.id}/sessions/", params={"limit": 1}),
+        expected_json=[session_checker(mub_sessions[0], check_mub=True)],
+        expected_headers={NEXT_CURSOR_HEADER_NAME: str},
+    )
+
+    assert_response(
+        mub_client.get(
+            f"/mub/users/{user.id}/sessions/",
+            params={"cursor": response.headers[NEXT_CURSOR_HEADER_NAME]},
+        ),
+        expected_json=[
+            session_checker(session, check_mub=True) for session in mub_sessions[1:]
+        ],
+    )
+
+
+@pytest.mark.parametrize("method", ["POST", "GET"])
 @pytest.mark.anyio()
 async def test_retrieving_mub_session_invalid_mub_key(
     client: TestClient,
@@ -9,6 +9,7 @@ from app.users.models.users_db import User
 from app.users.utils.authorization import AUTH_COOKIE_NAME, AUTH_HEADER_NAME
 from tests.common.active_session import ActiveSession
 from tests.common.assert_contains_ext import assert_nodata_response, assert_response
+from tests.common.query_counter import QueryCounter
 from tests.common.types import PytestRequest
 from tests.utils import assert_session_from_cookie
 
@@ -130,6 +131,27 @@ async def test_renewing_session_in_proxy_auth(
         assert session_from_cookie.id == session.id
 
 
+@pytest.mark.anyio()
+async def test_requesting_with_replaced_token(
+    active_session: ActiveSession,
+    authorized_client: TestClient,
+    session: Session,
+    user: User,
+    proxy_auth_path: str,
+) -> None:
+    async with active_session():
+        assert await session.renew()
+
+    assert_nodata_response(
+        authorized_client.get(proxy_auth_path),
+        expected_headers={
+            "Set-Cookie": None,
+            "X-User-ID": str(user.id),
+            "X-Session-ID": str(session.id),
+        },
+    )
+
+
 @pytest.fixture(
     params=["/api/users/current/home/", "/proxy/auth/"],
     ids=["home", "proxy_auth"],
@@ -138,6 +160,24 @@ def missing_auth_path(request: PytestRequest[str]) -> str:
     return request.param
 
 
+@pytest.mark.anyio()
+@pytest.mark.parametrize(
+    ("authorized_path", "expected_code"),
+    [
+        pytest.param("/api/users/current/home/", 200, id="home"),
+        pytest.param("/proxy/auth/", 204, id="proxy_auth"),
+        pytest.param("/proxy/optional-auth/", 204, id="optional_proxy_auth"),
+    ],
+)
+async def test_authorization_single_query(
+    authorized_client: TestClient, authorized_path: str, expected_code: int
+) -> None:
+    with QueryCounter() as query_counter:
+        response = authorized_client.get(authorized_path)
+    assert response.status_code == expected_code
+    assert query_counter.count == 1, query_counter.statements
+
+
 @pytest.mark.anyio()
 async def test_requesting_unauthorized(
     client: TestClient, missing_auth_path: str
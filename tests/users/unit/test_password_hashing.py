@@ -0,0 +1,231 @@
+import asyncio
+import threading
+from argparse import Namespace
+from collections.abc import Iterator
+
+import pytest
+from faker import Faker
+
+from app.common import password_hashing
+from app.common.password_hashing import (
+    PasswordHasher,
+    PasswordHashingBackend,
+    PasswordHashingOverloadedError,
+    PasswordHashingPolicy,
+    hash_password,
+)
+from app.common.password_hashing_benchmark import (
+    Measurement,
+    calibrate,
+    percentile,
+    recommend,
+)
+from tests.common.mock_stack import MockStack
+
+
+@pytest.fixture(params=list(PasswordHashingBackend))
+def password_hasher(request: pytest.FixtureRequest) -> Iterator[PasswordHasher]:
+    password_hasher = PasswordHasher(max_workers=2, backend=request.param)
+    yield password_hasher
+    password_hasher.shutdown()
+
+
+@pytest.mark.anyio()
+async def test_password_hashing(faker: Faker, password_hasher: PasswordHasher) -> None:
+    password: str = faker.password()
+    password_hash = await password_hasher.hash(password)
+
+    assert password_hash != password
+    assert await password_hasher.verify(password, password_hash)
+    assert not await password_hasher.verify(faker.password(), password_hash)
+
+
+@pytest.mark.anyio()
+async def test_password_hasher_warm_up(password_hasher: PasswordHasher) -> None:
+    await password_hasher.start()
+    assert password_hasher.executor is not None
+
+
+@pytest.mark.anyio()
+async def test_password_hasher_restart(
+    faker: Faker, password_hasher: PasswordHasher
+) -> None:
+    password: str = faker.password()
+    await password_hasher.hash(password)
+    password_hasher.shutdown()
+    assert password_hasher.executor is None
+
+    password_hash = await password_hasher.hash(password)
+    assert await password_hasher.verify(password, password_hash)
+
+
+@pytest.mark.anyio()
+async def test_password_hashing_off_event_loop(
+    faker: Faker, mock_stack: MockStack
+) -> None:
+    thread_names: list[str] = []
+    hash_password = password_hashing.hash_password
+
+    def hash_password_wrapper(password: str, policy: PasswordHashingPolicy) -> str:
+        thread_names.append(threading.current_thread().name)
+        return hash_password(password, policy)
+
+    mock_stack.enter_patch(password_hashing, "hash_password", new=hash_password_wrapper)
+
+    password_hasher = PasswordHasher(max_workers=1)
+    try:
+        await password_hasher.hash(faker.password())
+    finally:
+        password_hasher.shutdown()
+
+    assert len(thread_names) == 1
+    assert thread_names[0].startswith("password-hasher")
+
+
+@pytest.mark.anyio()
+async def test_password_hashing_admission_control(
+    faker: Faker, mock_stack: MockStack
+) -> None:
+    unblocked = threading.Event()
+    hash_password = password_hashing.hash_password
+
+    def blocking_hash_password(password: str, policy: PasswordHashingPolicy) -> str:
+        unblocked.wait(timeout=10)
+        return hash_password(password, policy)
+
+    mock_stack.enter_patch(
+        password_hashing, "hash_password", new=blocking_hash_password
+    )
+
+    password_hasher = PasswordHasher(max_workers=1, max_queue_size=1)
+    try:
+        running = asyncio.create_task(password_hasher.hash(faker.password()))
+        queued = asyncio.create_task(password_hasher.hash(faker.password()))
+        await asyncio.sleep(0.1)
+        assert password_hasher.in_flight == 1
+        assert password_hasher.queue_depth == 1
+
+        with pytest.raises(PasswordHashingOverloadedError):
+            await password_hasher.hash(faker.password())
+
+        unblocked.set()
+        await asyncio.gather(running, queued)
+    finally:
+        password_hasher.shutdown()
+
+    metrics = password_hasher.metrics()
+    assert metrics.in_flight == 0
+    assert metrics.queue_depth == 0
+    assert metrics.admitted == 2
+    assert metrics.rejected == 1
+    assert metrics.wait_time_max > 0
+    assert metrics.wait_time_total >= metrics.wait_time_max
+
+
+@pytest.mark.anyio()
+async def test_password_hashing_policy(faker: Faker) -> None:
+    password: str = faker.password()
+    old_password_hasher = PasswordHasher(
+        max_workers=1, policy=PasswordHashingPolicy(rounds=1000)
+    )
+    new_password_hasher = PasswordHasher(
+        max_workers=1, policy=PasswordHashingPolicy(rounds=2000)
+    )
+    try:
+        old_password_hash = await old_password_hasher.hash(password)
+        assert "$1000$" in old_password_hash
+        assert not old_password_hasher.needs_update(old_password_hash)
+
+        assert await new_password_hasher.verify(password, old_password_hash)
+        assert new_password_hasher.needs_update(old_password_hash)
+
+        new_password_hash = await new_password_hasher.hash(password)
+        assert "$2000$" in new_password_hash
+        assert not new_password_hasher.needs_update(new_password_hash)
+    finally:
+        old_password_hasher.shutdown()
+        new_password_hasher.shutdown()
+
+
+@pytest.mark.anyio()
+async def test_password_hashing_policy_deprecated_schemes(faker: Faker) -> None:
+    password: str = faker.password()
+    password_hasher = PasswordHasher(
+        max_workers=1,
+        policy=PasswordHashingPolicy(
+            scheme="pbkdf2_sha512", deprecated_schemes=("pbkdf2_sha256",)
+        ),
+    )
+    try:
+        old_password_hash = hash_password(
+            password, PasswordHashingPolicy(scheme="pbkdf2_sha256")
+        )
+        assert await password_hasher.verify(password, old_password_hash)
+        assert password_hasher.needs_update(old_password_hash)
+
+        new_password_hash = await password_hasher.hash(password)
+        assert new_password_hash.startswith("$pbkdf2-sha512$")
+        assert not password_hasher.needs_update(new_password_hash)
+    finally:
+        password_hasher.shutdown()
+
+
+def test_password_hashing_calibration_recommendation() -> None:
+    def measurement(
+        rounds: int, max_workers: int, verify_p99_ms: float, signins: float
+    ) -> Measurement:
+        return Measurement(
+            rounds=rounds,
+            backend=PasswordHashingBackend.THREAD,
+            max_workers=max_workers,
+            hash_p50_ms=verify_p99_ms,
+            hash_p99_ms=verify_p99_ms,
+            verify_p50_ms=verify_p99_ms,
+            verify_p99_ms=verify_p99_ms,
+            signins_per_second=signins,
+        )
+
+    measurements = [
+        measurement(rounds=1000, max_workers=1, verify_p99_ms=10, signins=100),
+        measurement(rounds=2000, max_workers=1, verify_p99_ms=20, signins=50),
+        measurement(rounds=2000, max_workers=2, verify_p99_ms=20, signins=100),
+        measurement(rounds=4000, max_workers=2, verify_p99_ms=40, signins=50),
+    ]
+
+    assert recommend(measurements, target_p99=30, target_rps=40) == measurements[1]
+    assert recommend(measurements, target_p99=30, target_rps=80) == measurements[2]
+    assert recommend(measurements, target_p99=50, target_rps=40) == measurements[3]
+    assert recommend(measurements, target_p99=5, target_rps=40) is None
+
+
+def test_password_hashing_calibration_percentile() -> None:
+    latencies: list[float] = [5, 1, 4, 2, 3]
+
+    assert percentile(latencies, 0.5) == 3
+    assert percentile(latencies, 0.99) == 5
+    assert percentile(latencies, 0) == 1
+
+
+@pytest.mark.anyio()
+async def test_password_hashing_calibration() -> None:
+    result = await calibrate(
+        Namespace(
+            rounds=[1000, 2000],
+            backends=[PasswordHashingBackend.THREAD],
+            workers=[1],
+            requests=4,
+            target_p99=60_000,
+            target_rps=0,
+        )
+    )
+
+    measurements = result["measurements"]
+    assert [measurement["rounds"] for measurement in measurements] == [1000, 2000]
+    for measurement in measurements:
+        assert measurement["max_workers"] == 1
+        assert measurement["hash_p50_ms"] <= measurement["hash_p99_ms"]
+        assert measurement["verify_p50_ms"] <= measurement["verify_p99_ms"]
+        assert measurement["signins_per_second"] > 0
+
+    assert result["recommendation"]["settings"]["PASSWORD_HASHING__ROUNDS"] == 2000
+    assert result["recommendation"]["settings"]["PASSWORD_HASHING__MAX_WORKERS"] == 1
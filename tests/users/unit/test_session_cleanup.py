@@ -1,29 +1,22 @@
 from datetime import datetime
-from typing import Any
 
 import pytest
 
+from app.common.config import sessions_producer
 from app.users.models.sessions_db import Session
 from app.users.models.users_db import User
 from tests.common.active_session import ActiveSession
 from tests.common.mock_stack import MockStack
+from tests.common.query_counter import QueryCounter
 from tests.common.types import Factory
 
 
 @pytest.mark.anyio()
-@pytest.mark.parametrize(
-    "method",
-    [
-        pytest.param(Session.cleanup_by_user, id="complete"),
-        pytest.param(Session.cleanup_concurrent_by_user, id="specific"),
-    ],
-)
 async def test_concurrent_sessions_limit(
     active_session: ActiveSession,
     session_factory: Factory[Session],
     user: User,
     mock_stack: MockStack,
-    method: Any,
 ) -> None:
     max_concurrent = 2
     total_mub = 3
@@ -41,7 +34,7 @@ async def test_concurrent_sessions_limit(
     ]
 
     async with active_session():
-        await method(user_id=user.id)
+        await Session.cleanup_by_user(user_id=user.id)
 
     max_concurrent_sessions_mock.assert_called_once_with()
 
@@ -69,19 +62,11 @@ async def test_concurrent_sessions_limit(
 
 @pytest.mark.anyio()
 @pytest.mark.parametrize("mub", [True, False])
-@pytest.mark.parametrize(
-    "method",
-    [
-        pytest.param(Session.cleanup_by_user, id="complete"),
-        pytest.param(Session.cleanup_history_by_user, id="specific"),
-    ],
-)
 async def test_session_history_limit(
     active_session: ActiveSession,
     session_factory: Factory[Session],
     user: User,
     mock_stack: MockStack,
-    method: Any,
     mub: bool,
 ) -> None:
     max_history = 4
@@ -100,7 +85,7 @@ async def test_session_history_limit(
     ]
 
     async with active_session():
-        await method(user_id=user.id)
+        await Session.cleanup_by_user(user_id=user.id)
 
     max_history_sessions_mock.assert_called_once_with()
 
@@ -132,8 +117,73 @@ async def test_session_expiry_time_limit(
     ).id
 
     async with active_session():
-        await Session.cleanup_history_by_user(user_id=user.id)
+        await Session.cleanup_by_user(user_id=user.id)
 
     async with active_session():
         session = await Session.find_first_by_id(expired_session_id)
         assert session is None
+
+
+@pytest.mark.anyio()
+async def test_cleanup_in_one_query(
+    active_session: ActiveSession,
+    session_factory: Factory[Session],
+    user: User,
+    mock_stack: MockStack,
+) -> None:
+    mock_stack.enter_mock(Session, "max_concurrent_sessions", property_value=1)
+    mock_stack.enter_mock(Session, "max_history_sessions", property_value=2)
+    session_ids = [(await session_factory()).id for _ in range(4)][::-1]
+
+    async with active_session():
+        with QueryCounter() as query_counter:
+            assert await Session.cleanup(user_ids=[user.id]) == (1, 2)
+        assert query_counter.count == 1, query_counter.statements
+
+    async with active_session():
+        sessions = [
+            await Session.find_first_by_id(session_id) for session_id in session_ids
+        ]
+    assert sessions[0] is not None
+    assert not sessions[0].invalid
+    assert sessions[1] is not None
+    assert sessions[1].invalid
+    assert sessions[2:] == [None, None]
+
+
+@pytest.mark.anyio()
+async def test_cleanup_for_users_batch(
+    active_session: ActiveSession,
+    user: User,
+    other_user: User,
+    mock_stack: MockStack,
+) -> None:
+    mock_stack.enter_mock(Session, "max_concurrent_sessions", property_value=1)
+    for target_user in (user, other_user):
+        async with active_session():
+            for _ in range(2):
+                await Session.create(user_id=target_user.id)
+
+    async with active_session():
+        assert await Session.cleanup(user_ids=[user.id, other_user.id]) == (2, 0)
+
+
+@pytest.mark.anyio()
+async def test_cleanup_broadcasts_valid_sessions_only(
+    active_session: ActiveSession,
+    session_factory: Factory[Session],
+    user: User,
+    mock_stack: MockStack,
+) -> None:
+    mock_stack.enter_mock(Session, "max_concurrent_sessions", property_value=1)
+    await session_factory(expiry=datetime.fromtimestamp(0))
+    overflowing_session = await session_factory()
+    await session_factory()
+    send_event_mock = mock_stack.enter_async_mock(sessions_producer, "send_event")
+
+    async with active_session():
+        assert await Session.cleanup(user_ids=[user.id]) == (1, 1)
+
+    send_event_mock.assert_called_once_with(
+        {"session_ids": [overflowing_session.id]}, event_name="sessions-disabled"
+    )
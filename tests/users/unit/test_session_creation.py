@@ -0,0 +1,22 @@
+import pytest
+
+from app.common.cryptography import hash_token
+from app.users.models.sessions_db import Session
+from app.users.models.users_db import User
+from tests.common.active_session import ActiveSession
+from tests.common.query_counter import QueryCounter
+from tests.utils import get_db_session
+
+
+@pytest.mark.anyio()
+async def test_creating_session_in_one_query(
+    active_session: ActiveSession, user: User
+) -> None:
+    async with active_session():
+        with QueryCounter() as query_counter:
+            session = await Session.create(user_id=user.id)
+        assert query_counter.count == 1, query_counter.statements
+
+    async with active_session():
+        db_session = await get_db_session(session)
+    assert db_session.token_digest == hash_token(session.token)
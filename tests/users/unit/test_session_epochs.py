@@ -0,0 +1,120 @@
+import pytest
+from starlette.testclient import TestClient
+
+from app.users.models.sessions_db import Session
+from app.users.models.users_db import User
+from app.users.utils.authorization import AUTH_HEADER_NAME
+from tests.common.active_session import ActiveSession
+from tests.common.assert_contains_ext import assert_response
+from tests.common.mock_stack import MockStack
+from tests.common.query_counter import QueryCounter
+from tests.common.types import Factory
+from tests.utils import get_db_session, get_db_user
+
+
+@pytest.mark.anyio()
+async def test_revoking_sessions_by_epoch(
+    active_session: ActiveSession,
+    session_factory: Factory[Session],
+    user: User,
+) -> None:
+    current_session = await session_factory()
+    other_sessions = [await session_factory() for _ in range(3)]
+    mub_session = await session_factory(mub=True)
+
+    async with active_session():
+        current_session = await get_db_session(current_session)
+        with QueryCounter() as query_counter:
+            await current_session.disable_all_other()
+        assert query_counter.count == 2, query_counter.statements
+
+    async with active_session():
+        assert (await get_db_user(user)).session_epoch == user.session_epoch + 1
+        assert not (await get_db_session(current_session)).invalid
+        assert not (await get_db_session(mub_session)).invalid
+        for other_session in other_sessions:
+            db_session = await get_db_session(other_session)
+            assert not db_session.disabled
+            assert db_session.revoked
+            assert db_session.invalid
+
+
+@pytest.mark.anyio()
+async def test_revoking_sessions_after_concurrent_renewal(
+    active_session: ActiveSession,
+    session_factory: Factory[Session],
+) -> None:
+    current_session = await session_factory()
+    async with active_session():
+        stale_session = await get_db_session(current_session)
+    async with active_session():
+        assert await (await get_db_session(current_session)).renew()
+
+    async with active_session():
+        await stale_session.disable_all_other()
+
+    async with active_session():
+        db_session = await get_db_session(current_session)
+        assert db_session.epoch == stale_session.epoch
+        assert not db_session.invalid
+
+
+@pytest.mark.anyio()
+async def test_creating_session_in_new_epoch(
+    active_session: ActiveSession,
+    session_factory: Factory[Session],
+) -> None:
+    current_session = await session_factory()
+    async with active_session():
+        await (await get_db_session(current_session)).disable_all_other()
+
+    new_session = await session_factory()
+    assert not new_session.invalid
+    async with active_session():
+        db_session = await get_db_session(new_session)
+        assert db_session.epoch == (await get_db_session(current_session)).epoch
+        assert not db_session.invalid
+
+
+@pytest.mark.anyio()
+async def test_revoked_session_unauthorized(
+    client: TestClient,
+    authorized_client: TestClient,
+    other_session_token: str,
+    session_factory: Factory[Session],
+) -> None:
+    revoked_session = await session_factory()
+
+    assert authorized_client.delete("/api/sessions/").status_code == 204
+
+    assert_response(
+        client.get(
+            "/api/sessions/current/",
+            headers={AUTH_HEADER_NAME: revoked_session.token},
+        ),
+        expected_code=401,
+        expected_json={"detail": "Session is invalid"},
+    )
+    assert_response(
+        client.get(
+            "/api/sessions/current/", headers={AUTH_HEADER_NAME: other_session_token}
+        ),
+        expected_json={"invalid": False},
+    )
+
+
+@pytest.mark.anyio()
+async def test_revoked_sessions_not_concurrent(
+    mock_stack: MockStack,
+    active_session: ActiveSession,
+    session_factory: Factory[Session],
+    user: User,
+) -> None:
+    mock_stack.enter_mock(Session, "max_concurrent_sessions", property_value=1)
+    current_session = await session_factory()
+    await session_factory()
+    async with active_session():
+        await (await get_db_session(current_session)).disable_all_other()
+
+    async with active_session():
+        assert await Session.cleanup(user_ids=[user.id]) == (0, 0)
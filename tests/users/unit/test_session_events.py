@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+from typing import Any
+
+import pytest
+from starlette.testclient import TestClient
+
+from app.common.config import sessions_producer
+from app.users.models.sessions_db import Session
+from app.users.utils.session_cache import (
+    CachedSession,
+    cache_session,
+    handle_session_event,
+    session_cache,
+)
+from tests.common.mock_stack import MockStack
+
+
+def cache_sessions(user_id: int, *session_ids: int) -> None:
+    expiry = datetime.utcnow() + timedelta(days=1)
+    for session_id in session_ids:
+        cache_session(
+            f"token-{session_id}".encode(),
+            CachedSession(
+                session_id=session_id,
+                user_id=user_id,
+                username="username",
+                cross_site=False,
+                expiry=expiry,
+                renewal_deadline=expiry,
+            ),
+        )
+
+
+@pytest.mark.anyio()
+@pytest.mark.parametrize("event_name", ["session-disabled", "session-deleted"])
+async def test_handling_session_revocation(event_name: str) -> None:
+    cache_sessions(1, 1, 2)
+
+    await handle_session_event({"session_id": 1}, event_name)
+
+    assert session_cache.get(b"token-1") is None
+    assert session_cache.get(b"token-2") is not None
+
+
+@pytest.mark.anyio()
+@pytest.mark.parametrize("event_name", ["sessions-disabled", "sessions-deleted"])
+async def test_handling_sessions_batch_revocation(event_name: str) -> None:
+    cache_sessions(1, 1, 2)
+    cache_sessions(2, 3)
+
+    await handle_session_event({"session_ids": [1, 3]}, event_name)
+
+    assert session_cache.get(b"token-1") is None
+    assert session_cache.get(b"token-2") is not None
+    assert session_cache.get(b"token-3") is None
+
+
+@pytest.mark.anyio()
+@pytest.mark.parametrize(
+    ("event_name", "data", "expected_session_ids"),
+    [
+        pytest.param(
+            "user-sessions-disabled",
+            {"user_id": 1, "exclude_session_id": 2},
+            [2, 3],
+            id="disable_all_other",
+        ),
+        pytest.param("user-updated", {"user_id": 1}, [3], id="user_updated"),
+        pytest.param("user-deleted", {"user_id": 1}, [3], id="user_deleted"),
+    ],
+)
+async def test_handling_user_sessions_revocation(
+    event_name: str, data: dict[str, Any], expected_session_ids: list[int]
+) -> None:
+    cache_sessions(1, 1, 2)
+    cache_sessions(2, 3)
+
+    await handle_session_event(data, event_name)
+
+    assert [
+        session_id
+        for session_id in (1, 2, 3)
+        if session_cache.get(f"token-{session_id}".encode()) is not None
+    ] == expected_session_ids
+
+
+@pytest.mark.anyio()
+async def test_broadcasting_session_revocation(
+    mock_stack: MockStack,
+    authorized_client: TestClient,
+    session: Session,
+) -> None:
+    send_event_mock = mock_stack.enter_async_mock(sessions_producer, "send_event")
+
+    assert authorized_client.post("/api/signout/").status_code == 204
+
+    send_event_mock.assert_called_once_with(
+        {"session_id": session.id}, event_name="session-disabled"
+    )
@@ -0,0 +1,109 @@
+import re
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from typing import Any
+
+import pytest
+from sqlalchemy import text
+
+from app.users.models.sessions_db import Session
+from app.users.models.users_db import User
+from tests.common.active_session import ActiveSession
+from tests.common.query_counter import QueryCounter
+
+SYNTHETIC_USERS = 500
+SESSIONS_PER_USER = 40
+
+# indexes on partitions are named by postgres, like "sessions_default_user_id_idx"
+# (single sessions are updated by id, through the primary key)
+SESSION_INDEX_SCAN = re.compile(
+    r"Index (Only )?Scan (using|on) \w*(_user_id_\w*|_pkey)"
+)
+
+
+@pytest.fixture()
+async def synthetic_sessions(active_session: ActiveSession, user: User) -> None:
+    users_table = User.__table__.fullname  # type: ignore[attr-defined]
+    sessions_table = Session.__table__.fullname  # type: ignore[attr-defined]
+    async with active_session() as session:
+        await session.execute(
+            text(
+                f"INSERT INTO {users_table} (email, username, password, "  # noqa: S608
+                "onboarding_stage, theme, last_password_change, email_confirmed, "
+                "allowed_confirmation_resend) "
+                "SELECT 'synthetic' || n || '@example.com', 'synthetic' || n, '', "
+                "'CREATED', 'system', now(), false, now() "
+                "FROM generate_series(1, :users) AS n"
+            ),
+            {"users": SYNTHETIC_USERS},
+        )
+        await session.execute(
+            text(
+                f"INSERT INTO {sessions_table} (user_id, token_digest, "  # noqa: S608
+                "expiry, disabled, created, cross_site, mub) "
+                "SELECT users.id, sha256((random()::text || n)::bytea), "
+                "now() + random() * interval '14 days' - interval '7 days', "
+                "random() < 0.7, now(), false, random() < 0.05 "
+                f"FROM {users_table} AS users, generate_series(1, :sessions) AS n"
+            ),
+            {"sessions": SESSIONS_PER_USER},
+        )
+        await session.execute(text(f"ANALYZE {users_table}"))
+        await session.execute(text(f"ANALYZE {sessions_table}"))
+
+
+async def disable_all_other(user: User) -> None:
+    session = await Session.find_first_by_kwargs(user_id=user.id)
+    assert session is not None
+    await session.disable_all_other()
+
+
+@pytest.mark.anyio()
+@pytest.mark.usefixtures("synthetic_sessions")
+@pytest.mark.parametrize(
+    "query",
+    [
+        pytest.param(lambda user: Session.find_by_user(user.id), id="find_by_user"),
+        pytest.param(
+            lambda user: Session.find_by_user(
+                user.id, after=(datetime.utcnow(), 0), limit=10
+            ),
+            id="find_by_user_paginated",
+        ),
+        pytest.param(
+            lambda user: Session.find_all_by_user(
+                user.id, after=(datetime.utcnow(), 0), limit=10
+            ),
+            id="find_all_by_user_paginated",
+        ),
+        pytest.param(
+            lambda user: Session.cleanup_by_user(user.id), id="cleanup_by_user"
+        ),
+        pytest.param(disable_all_other, id="disable_all_other"),
+    ],
+)
+async def test_session_queries_use_indexes(
+    active_session: ActiveSession,
+    user: User,
+    query: Callable[[User], Awaitable[Any]],
+) -> None:
+    async with active_session() as session:
+        with QueryCounter() as query_counter:
+            await query(user)
+
+        connection = await session.connection()
+        for statement, parameters in zip(
+            query_counter.statements, query_counter.parameters, strict=True
+        ):
+            if "sessions" not in statement:
+                continue
+            plan = "\n".join(
+                row[0]
+                for row in await connection.exec_driver_sql(
+                    f"EXPLAIN {statement}", parameters
+                )
+            )
+            assert "Seq Scan on sessions" not in plan, plan
+            assert SESSION_INDEX_SCAN.search(plan) is not None, plan
+
+        await session.rollback()
@@ -0,0 +1,244 @@
+import asyncio
+from collections.abc import AsyncIterator
+from datetime import date, datetime
+
+import pytest
+from freezegun import freeze_time
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app.common.config import engine, sessionmaker
+from app.common.sqlalchemy_ext import session_context
+from app.users.models.sessions_db import Session
+from app.users.models.users_db import User
+from app.users.utils.session_partitions import (
+    drop_session_partition,
+    get_period_start,
+    list_session_partitions,
+    maintain_session_partitions,
+    sessions_table,
+)
+from app.users.utils.session_sweeper import remove_session_partition
+from tests.common.active_session import ActiveSession
+
+# far from the real clock, so partitions created by other tests don't interfere
+NOW = datetime(2100, 6, 16, 12, 30)
+
+
+@pytest.fixture()
+async def partitions(active_session: ActiveSession) -> AsyncIterator[None]:
+    async with active_session():
+        existing = await list_session_partitions()
+    yield
+    async with active_session():
+        for start in await list_session_partitions():
+            if start not in existing:
+                await drop_session_partition(start)
+
+
+async def find_partition_name(active_session: ActiveSession, session_id: int) -> str:
+    async with active_session() as session:
+        return await session.scalar(  # type: ignore[no-any-return]
+            text(
+                f"SELECT tableoid::regclass::text FROM {sessions_table.fullname} "  # noqa: S608
+                "WHERE id = :id"
+            ),
+            {"id": session_id},
+        )
+
+
+def test_period_start() -> None:
+    assert get_period_start(NOW) == date(2100, 6, 14)
+    assert get_period_start(datetime(2100, 6, 14)) == date(2100, 6, 14)
+
+
+@pytest.mark.anyio()
+@pytest.mark.usefixtures("partitions")
+async def test_creating_partitions(active_session: ActiveSession) -> None:
+    async with active_session():
+        created, expired = await maintain_session_partitions(NOW)
+    assert expired == []
+
+    last_start = get_period_start(
+        NOW + Session.expiry_timeout + Session.partition_period
+    )
+    assert created[0] == get_period_start(NOW)
+    assert created[-1] == last_start
+    assert all(
+        later - earlier == Session.partition_period
+        for earlier, later in zip(created, created[1:])
+    )
+
+    async with active_session():
+        assert set(created) <= set(await list_session_partitions())
+        assert await maintain_session_partitions(NOW) == ([], [])
+
+
+@pytest.mark.anyio()
+@pytest.mark.usefixtures("partitions")
+async def test_moving_sessions_from_default_partition(
+    active_session: ActiveSession, user: User
+) -> None:
+    async with active_session():
+        session = await Session.create(user_id=user.id, expiry=NOW)
+    assert await find_partition_name(active_session, session.id) == (
+        f"{sessions_table.fullname}_default"
+    )
+
+    async with active_session():
+        await maintain_session_partitions(NOW)
+    assert await find_partition_name(active_session, session.id) == (
+        f"{sessions_table.fullname}_p{get_period_start(NOW):%Y%m%d}"
+    )
+
+    async with active_session():
+        found = await Session.find_first_by_id(session.id)
+        assert found is not None
+        assert found.token_digest == session.token_digest
+
+
+@pytest.mark.anyio()
+@pytest.mark.usefixtures("partitions")
+async def test_renewing_session_across_partitions(
+    active_session: ActiveSession, user: User
+) -> None:
+    async with active_session():
+        await maintain_session_partitions(NOW)
+        session = await Session.create(user_id=user.id, expiry=NOW)
+
+    async with active_session():
+        found = await Session.find_first_by_id(session.id)
+        assert found is not None
+        found.expiry = NOW + Session.partition_period
+
+    assert await find_partition_name(active_session, session.id) == (
+        f"{sessions_table.fullname}_p"
+        f"{get_period_start(NOW + Session.partition_period):%Y%m%d}"
+    )
+
+
+@pytest.mark.anyio()
+@pytest.mark.usefixtures("partitions")
+async def test_concurrent_renewal_across_partitions(
+    active_session: ActiveSession, user: User
+) -> None:
+    async with active_session():
+        await maintain_session_partitions(NOW)
+        session = await Session.create(user_id=user.id, expiry=NOW)
+    async with active_session():
+        first_session = await Session.find_first_by_id(session.id)
+    async with active_session():
+        second_session = await Session.find_first_by_id(session.id)
+    assert first_session is not None
+    assert second_session is not None
+
+    async def renew_second_session() -> bool:
+        async with sessionmaker.begin() as db_session:
+            session_context.set(db_session)
+            return await second_session.renew()
+
+    async with active_session():
+        assert await first_session.renew()
+        second_renewal = asyncio.create_task(renew_second_session())
+        # let the second renewal block on the row moved by the first one
+        await asyncio.sleep(0.5)
+    assert not await second_renewal
+
+    assert await find_partition_name(active_session, session.id) == (
+        f"{sessions_table.fullname}_default"
+    )
+    async with active_session():
+        found = await Session.find_first_by_id(session.id)
+        assert found is not None
+        assert found.token_digest == first_session.token_digest
+
+
+@pytest.mark.anyio()
+@pytest.mark.usefixtures("partitions")
+async def test_dropping_expired_partitions(
+    active_session: ActiveSession, user: User
+) -> None:
+    async with active_session():
+        await maintain_session_partitions(NOW)
+        session = await Session.create(user_id=user.id, expiry=NOW)
+
+    later = NOW + Session.max_history_timedelta + Session.partition_period * 2
+    async with active_session():
+        _, expired = await maintain_session_partitions(later)
+    assert get_period_start(NOW) in expired
+    assert all(
+        start + Session.partition_period
+        <= (later - Session.max_history_timedelta).date()
+        for start in expired
+    )
+
+    async with active_session():
+        assert set(expired) <= set(await list_session_partitions())
+    for start in expired:
+        assert await remove_session_partition(start)
+
+    async with active_session():
+        assert await Session.find_first_by_id(session.id) is None
+        remaining = await list_session_partitions()
+    assert not set(expired) & set(remaining)
+    assert get_period_start(later) in remaining
+
+
+@pytest.mark.anyio()
+@pytest.mark.usefixtures("partitions")
+async def test_removing_partition_while_table_is_used(
+    active_session: ActiveSession,
+) -> None:
+    async with active_session():
+        await maintain_session_partitions(NOW)
+
+    async with engine.connect() as connection:
+        # an open transaction reading sessions conflicts with detaching
+        await connection.execute(
+            text(f"LOCK TABLE {sessions_table.fullname} IN ACCESS SHARE MODE")
+        )
+        assert not await remove_session_partition(get_period_start(NOW))
+        await connection.rollback()
+
+    async with active_session():
+        assert get_period_start(NOW) in await list_session_partitions()
+
+
+@pytest.mark.anyio()
+async def test_removing_missing_partition() -> None:
+    with pytest.raises(DBAPIError):
+        await remove_session_partition(get_period_start(NOW))
+
+
+@pytest.mark.anyio()
+@pytest.mark.usefixtures("partitions")
+async def test_partition_retention_within_history(
+    active_session: ActiveSession,
+) -> None:
+    async with active_session():
+        await maintain_session_partitions(NOW)
+        _, expired = await maintain_session_partitions(
+            NOW + Session.max_history_timedelta
+        )
+    assert get_period_start(NOW) not in expired
+
+
+@pytest.mark.anyio()
+@pytest.mark.usefixtures("partitions")
+async def test_cleanup_leaves_expired_sessions_to_partitions(
+    active_session: ActiveSession, user: User
+) -> None:
+    async with active_session():
+        await maintain_session_partitions(NOW)
+        partitioned_session = await Session.create(user_id=user.id, expiry=NOW)
+        default_session = await Session.create(
+            user_id=user.id, expiry=datetime.fromtimestamp(0)
+        )
+
+    with freeze_time(NOW + Session.max_history_timedelta * 2):
+        async with active_session():
+            assert await Session.cleanup(user_ids=[user.id]) == (0, 1)
+
+    async with active_session():
+        assert await Session.find_first_by_id(default_session.id) is None
+        assert await Session.find_first_by_id(partitioned_session.id) is not None
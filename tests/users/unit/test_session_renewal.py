@@ -1,4 +1,4 @@
-from datetime import timedelta, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Final
 
 import pytest
@@ -6,6 +6,7 @@ from fastapi import Response
 from freezegun import freeze_time
 
 from app.common.config import settings
+from app.common.cryptography import hash_token
 from app.users.models.sessions_db import Session
 from app.users.models.users_db import User
 from app.users.utils.authorization import AUTH_COOKIE_NAME, authorize_user
@@ -44,9 +45,62 @@ async def test_renewal_method(
 ) -> None:
     old_expiry = session.expiry
     async with active_session():
-        session.renew()
+        assert await session.renew()
     assert session.token != session_token
+    assert session.token_digest == hash_token(session.token)
     assert session.expiry > old_expiry
+    assert session.previous_token_digest == hash_token(session_token)
+
+    async with active_session():
+        db_session = await get_db_session(session)
+        assert db_session.token_digest == session.token_digest
+        assert db_session.previous_token_digest == hash_token(session_token)
+
+
+@pytest.mark.anyio()
+async def test_concurrent_renewal(
+    active_session: ActiveSession,
+    session: Session,
+    session_token: str,
+) -> None:
+    async with active_session():
+        first_session = await get_db_session(session)
+    async with active_session():
+        second_session = await get_db_session(session)
+
+    async with active_session():
+        assert await first_session.renew()
+    async with active_session():
+        assert not await second_session.renew()
+
+    async with active_session():
+        db_session = await get_db_session(session)
+        assert db_session.token_digest == first_session.token_digest
+        assert db_session.previous_token_digest == hash_token(session_token)
+
+
+@pytest.mark.anyio()
+@pytest.mark.parametrize(
+    ("passed", "accepted"),
+    [
+        pytest.param(timedelta(0), True, id="in_grace_period"),
+        pytest.param(Session.renewal_grace_period * 2, False, id="after_grace_period"),
+    ],
+)
+async def test_finding_by_previous_token(
+    active_session: ActiveSession,
+    session: Session,
+    session_token: str,
+    passed: timedelta,
+    accepted: bool,
+) -> None:
+    async with active_session():
+        assert await session.renew()
+
+    with freeze_time(datetime.utcnow() + passed):
+        async with active_session():
+            found_session = await Session.find_first_by_token(session_token)
+    assert (found_session is not None) == accepted
 
 
 @pytest.mark.anyio()
@@ -68,7 +122,9 @@ async def test_automatic_renewal(
         session_is_renewal_required = mock_stack.enter_mock(
             Session, "is_renewal_required", return_value=True
         )
-        session_renew_mock = mock_stack.enter_mock(Session, "renew")
+        session_renew_mock = mock_stack.enter_async_mock(
+            Session, "renew", return_value=True
+        )
 
     response = Response()
     response_set_cookie_mock = mock_stack.enter_mock(response, "set_cookie")
@@ -87,3 +143,25 @@ async def test_automatic_renewal(
         httponly=True,
         secure=True,
     )
+
+
+@pytest.mark.anyio()
+async def test_coalescing_renewal(
+    mock_stack: MockStack,
+    active_session: ActiveSession,
+    session: Session,
+) -> None:
+    mock_stack.enter_mock(Session, "is_renewal_required", return_value=True)
+    session_renew_mock = mock_stack.enter_async_mock(
+        Session, "renew", return_value=True
+    )
+    mock_stack.enter_patch(
+        "app.users.utils.authorization.renewing_session_ids", new={session.id}
+    )
+
+    response = Response()
+    async with active_session():
+        await authorize_user(await get_db_session(session), response)
+
+    session_renew_mock.assert_not_called()
+    assert "set-cookie" not in response.headers
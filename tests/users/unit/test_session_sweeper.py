@@ -0,0 +1,156 @@
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy import text
+
+from app.common.config import engine
+from app.users.models.sessions_db import Session
+from app.users.models.users_db import User
+from app.users.utils import session_sweeper
+from app.users.utils.session_sweeper import (
+    SWEEPER_LOCK_KEY,
+    run_session_sweeper,
+    sweep_sessions,
+)
+from tests.common.active_session import ActiveSession
+from tests.common.mock_stack import MockStack
+
+
+async def create_sessions(
+    active_session: ActiveSession, user: User, count: int, **kwargs: bool
+) -> list[int]:
+    async with active_session():
+        return [
+            (await Session.create(user_id=user.id, **kwargs)).id for _ in range(count)
+        ][::-1]
+
+
+async def find_sessions(active_session: ActiveSession, user: User) -> list[Session]:
+    async with active_session():
+        return list(
+            await Session.find_all_by_kwargs(Session.expiry.desc(), user_id=user.id)
+        )
+
+
+@pytest.mark.anyio()
+@pytest.mark.parametrize("batch_size", [1, 1000])
+async def test_sweeping_concurrent_sessions(
+    mock_stack: MockStack,
+    active_session: ActiveSession,
+    user: User,
+    other_user: User,
+    batch_size: int,
+) -> None:
+    max_concurrent = 2
+    mock_stack.enter_mock(
+        Session, "max_concurrent_sessions", property_value=max_concurrent
+    )
+
+    session_ids = await create_sessions(active_session, user, count=5)
+    other_session_ids = await create_sessions(active_session, other_user, count=3)
+    mub_session_ids = await create_sessions(active_session, user, count=3, mub=True)
+
+    assert await sweep_sessions(batch_size=batch_size)
+
+    for target_user, target_session_ids in (
+        (user, session_ids),
+        (other_user, other_session_ids),
+    ):
+        valid_session_ids = [
+            session.id
+            for session in await find_sessions(active_session, target_user)
+            if not session.invalid and not session.mub
+        ]
+        assert valid_session_ids == target_session_ids[:max_concurrent]
+
+    assert {
+        session.id
+        for session in await find_sessions(active_session, user)
+        if not session.invalid and session.mub
+    } == set(mub_session_ids)
+
+
+@pytest.mark.anyio()
+@pytest.mark.parametrize("batch_size", [1, 1000])
+async def test_sweeping_session_history(
+    mock_stack: MockStack,
+    active_session: ActiveSession,
+    user: User,
+    other_user: User,
+    batch_size: int,
+) -> None:
+    max_history = 3
+    mock_stack.enter_mock(Session, "max_history_sessions", property_value=max_history)
+
+    async with active_session():
+        await Session.create(user_id=user.id, expiry=datetime.fromtimestamp(0))
+    session_ids = await create_sessions(active_session, user, count=5, disabled=True)
+    other_session_ids = await create_sessions(
+        active_session, other_user, count=2, disabled=True
+    )
+
+    assert await sweep_sessions(batch_size=batch_size)
+
+    assert [
+        session.id for session in await find_sessions(active_session, user)
+    ] == session_ids[:max_history]
+    assert [
+        session.id for session in await find_sessions(active_session, other_user)
+    ] == other_session_ids
+
+
+@pytest.mark.anyio()
+async def test_sweeping_skipped_while_locked(
+    mock_stack: MockStack,
+    active_session: ActiveSession,
+    user: User,
+) -> None:
+    mock_stack.enter_mock(Session, "max_concurrent_sessions", property_value=1)
+    session_ids = await create_sessions(active_session, user, count=3)
+
+    async with engine.connect() as connection:
+        await connection.execute(
+            text("SELECT pg_advisory_lock(hashtext(:key))"), {"key": SWEEPER_LOCK_KEY}
+        )
+        try:
+            assert not await sweep_sessions(batch_size=1000)
+        finally:
+            await connection.execute(
+                text("SELECT pg_advisory_unlock(hashtext(:key))"),
+                {"key": SWEEPER_LOCK_KEY},
+            )
+            await connection.commit()
+
+    assert [
+        session.id
+        for session in await find_sessions(active_session, user)
+        if not session.invalid
+    ] == session_ids
+
+
+@pytest.mark.anyio()
+async def test_running_session_sweeper(mock_stack: MockStack) -> None:
+    sweep_sessions_mock = mock_stack.enter_mock(
+        session_sweeper,
+        "sweep_sessions",
+        mock=AsyncMock(
+            side_effect=[True, RuntimeError("sweeping failed"), asyncio.CancelledError]
+        ),
+    )
+
+    with pytest.raises(asyncio.CancelledError):
+        await run_session_sweeper(interval=0, batch_size=10)
+
+    assert sweep_sessions_mock.await_count == 3
+    sweep_sessions_mock.assert_awaited_with(10)
+
+
+@pytest.mark.anyio()
+async def test_running_session_sweeper_disabled(mock_stack: MockStack) -> None:
+    sweep_sessions_mock = mock_stack.enter_async_mock(session_sweeper, "sweep_sessions")
+
+    await run_session_sweeper(interval=None, batch_size=10)
+
+    sweep_sessions_mock.assert_not_awaited()
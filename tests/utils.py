@@ -5,6 +5,7 @@ from httpx import Response
 from pydantic_marshals.contains import assert_contains
 
 from app.common.config import settings
+from app.common.cryptography import hash_token
 from app.users.models.sessions_db import Session
 from app.users.models.users_db import User
 from app.users.utils.authorization import AUTH_COOKIE_NAME
@@ -23,7 +24,7 @@ async def get_db_session(session: Session) -> Session:
 
 
 async def assert_session(token: str, invalid: bool = False) -> Session:
-    session = await Session.find_first_by_kwargs(token=token)
+    session = await Session.find_first_by_kwargs(token_digest=hash_token(token))
     assert session is not None
     assert session.invalid == invalid
     return session